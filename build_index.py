@@ -1,10 +1,17 @@
 import os
+import sys
 import logging
 import argparse
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import CharacterTextSplitter
 from langchain.docstore.document import Document
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from model_registry import registry
+from paragraph_index import save_lookup
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -17,9 +24,89 @@ RETRAIN_DB_DIR = "vectordb_retrain"
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 50
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WORKERS = 1          # embedding processes; 1 embeds in this process
+SHARD_SIZE = 2048    # chunks per shard handed to a worker
+
+# With --workers N the chunks are cut into contiguous shards of SHARD_SIZE.
+# Each worker process loads its own MiniLM, limits torch to its share of the
+# CPU cores so the workers do not oversubscribe them, and returns its shard as
+# a serialized partial FAISS index. Shards are merged back in chunk order and
+# every chunk's docstore ID is its ordinal, so the saved index is the same for
+# any worker count. The parent never loads MiniLM for a sharded build.
+
+# --- Parallel Embedding ---
+class RegistryEmbeddings(Embeddings):
+    """The registry's MiniLM, acquired only while something is being embedded."""
+
+    def _call(self, method, arg):
+        model = registry.acquire(EMBEDDING_MODEL, "sentence-transformers")
+        try:
+            return getattr(model, method)(arg)
+        finally:
+            registry.release(EMBEDDING_MODEL, "sentence-transformers")
+
+    def embed_documents(self, texts):
+        return self._call("embed_documents", texts)
+
+    def embed_query(self, text):
+        return self._call("embed_query", text)
+
+_worker_threads = None
+
+def _init_worker(threads):
+    """Limit intra-op threads in an embedding worker before any model starts its pools."""
+    global _worker_threads
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _worker_threads = threads
+
+def _embed_shard(start, texts, metadatas, embeddings=None):
+    """Embed one shard and return it as a serialized partial FAISS index."""
+    if embeddings is None:
+        import torch
+        if _worker_threads:
+            torch.set_num_threads(_worker_threads)
+        embeddings = RegistryEmbeddings()
+    ids = [f"chunk-{start + i}" for i in range(len(texts))]
+    return FAISS.from_texts(texts, embeddings, metadatas=metadatas, ids=ids).serialize_to_bytes()
+
+def embed_chunks(chunks, workers=WORKERS, shard_size=SHARD_SIZE, embeddings=None):
+    """Embed chunks into a FAISS store, across `workers` processes when more than one.
+
+    embeddings defaults to the registry's MiniLM; anything else must be
+    picklable, since each worker gets its own copy.
+    """
+    texts = [chunk.page_content for chunk in chunks]
+    metadatas = [chunk.metadata for chunk in chunks]
+    if workers <= 1:
+        ids = [f"chunk-{i}" for i in range(len(texts))]
+        return FAISS.from_texts(texts, embeddings or RegistryEmbeddings(), metadatas=metadatas, ids=ids)
+
+    starts = range(0, len(texts), shard_size)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"⚙️ Embedding {len(texts)} chunks in {len(starts)} shards on {workers} workers "
+                f"({threads} threads each)...")
+    # spawn, not fork: the parent may already hold torch thread pools.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        shards = pool.map(_embed_shard, starts,
+                          [texts[i:i + shard_size] for i in starts],
+                          [metadatas[i:i + shard_size] for i in starts],
+                          [embeddings] * len(starts))
+        db = None
+        for shard in shards:  # map yields in submission order
+            part = FAISS.deserialize_from_bytes(shard, embeddings or RegistryEmbeddings(),
+                                                allow_dangerous_deserialization=True)
+            if db is None:
+                db = part
+            else:
+                db.merge_from(part)
+    return db
 
 # --- Build Index ---
-def build_index(mode, flagged_files=None):
+def build_index(mode, flagged_files=None, workers=WORKERS):
     """Build the FAISS vector database."""
     docs = []
 
@@ -49,11 +136,12 @@ def build_index(mode, flagged_files=None):
     chunks = splitter.split_documents(docs)
 
     # Embed and save
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-    db = FAISS.from_documents(chunks, embeddings)
+    db = embed_chunks(chunks, workers)
 
     output_dir = RETRAIN_DB_DIR if mode == "retrain" else VECTOR_DB_DIR
-    db.save_local(output_dir, index_name="travelbot" if mode == "all" else "travelbot_retrain")
+    index_name = "travelbot" if mode == "all" else "travelbot_retrain"
+    db.save_local(output_dir, index_name=index_name)
+    save_lookup(db, output_dir, index_name)
     logger.info(f"✅ Vector database saved to {output_dir}")
 
 # --- Main ---
@@ -61,9 +149,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build or retrain the FAISS vector database.")
     parser.add_argument("--mode", choices=["all", "retrain"], required=True, help="Mode: all or retrain")
     parser.add_argument("--flagged_files", nargs="*", help="List of flagged files (required for retrain mode)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Embedding processes (default: 1)")
     args = parser.parse_args()
 
     if args.mode == "retrain" and not args.flagged_files:
         parser.error("--flagged_files is required for retrain mode")
 
-    build_index(args.mode, flagged_files=args.flagged_files)
\ No newline at end of file
+    build_index(args.mode, flagged_files=args.flagged_files, workers=args.workers)
\ No newline at end of file
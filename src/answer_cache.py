@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+CACHE_PATH = os.environ.get("TRAVELBOT_CACHE_PATH", os.path.join("cache", "answer_cache.sqlite"))
+CACHE_TTL = int(os.environ.get("TRAVELBOT_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+CACHE_MAX_ENTRIES = int(os.environ.get("TRAVELBOT_CACHE_MAX_ENTRIES", "20000"))  # on-disk rows
+CACHE_MEMORY_ENTRIES = int(os.environ.get("TRAVELBOT_CACHE_MEMORY_ENTRIES", "512"))  # in-process LRU
+CACHE_DISABLED = os.environ.get("TRAVELBOT_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+_index_hashes = {}
+
+
+def normalize_query(query):
+    """Normalize a query so trivially different spellings share a cache entry."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def index_content_hash(db_path, index_name):
+    """Hash the FAISS index and docstore files so a rebuild changes every key."""
+    paths = [os.path.join(db_path, f"{index_name}.faiss"), os.path.join(db_path, f"{index_name}.pkl")]
+    stamp = tuple((p, os.path.getmtime(p), os.path.getsize(p)) for p in paths if os.path.exists(p))
+    if stamp in _index_hashes:
+        return _index_hashes[stamp]
+
+    digest = hashlib.sha256()
+    for path, _, _ in stamp:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    _index_hashes[stamp] = digest.hexdigest()
+    return _index_hashes[stamp]
+
+
+class AnswerCache:
+    """Exact-match cache with an in-process LRU in front of an SQLite store.
+
+    Entries live in named namespaces ("preface", "retrieval", ...). Keys are
+    built from the normalized query plus whatever the cached value depends on
+    (model ID, generation parameters, index hash), so changing any of those
+    simply stops matching old entries.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 memory_entries=CACHE_MEMORY_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._writes = 0
+
+        self._db = None
+        self._pid = None
+
+    def _connection(self):
+        """Return this process's SQLite connection, opening it on first use.
+
+        A connection must not cross a fork, so a forked worker that inherits the
+        cache opens its own instead of reusing the parent's.
+        """
+        if self._db is not None and self._pid == os.getpid():
+            return self._db
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, namespace TEXT, value TEXT,"
+            " created REAL, last_access REAL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+        db.commit()
+        self._db, self._pid = db, os.getpid()
+        return db
+
+    @staticmethod
+    def make_key(namespace, query, **depends_on):
+        """Build a cache key from the namespace, normalized query and dependencies."""
+        payload = json.dumps(
+            {"namespace": namespace, "query": normalize_query(query), **depends_on},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, namespace, outcome):
+        counts = self._stats.setdefault(namespace, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace, key):
+        """Return the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._count(namespace, "memory_hits")
+                    return value
+                del self._memory[key]
+
+            db = self._connection()
+            row = db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self._count(namespace, "misses")
+                return None
+
+            db.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self._count(namespace, "disk_hits")
+            return value
+
+    def set(self, namespace, key, value):
+        """Store a JSON-serialisable value under key."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, namespace, value, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, json.dumps(value), now, now),
+            )
+            db.commit()
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(now)
+
+    def _prune(self, now):
+        """Drop expired rows, then the least recently used rows above max_entries."""
+        db = self._connection()
+        db.execute("DELETE FROM cache WHERE created < ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        db.commit()
+
+    def stats(self):
+        """Return hit/miss counts and hit rate per namespace."""
+        with self._lock:
+            report = {}
+            for namespace, counts in self._stats.items():
+                lookups = sum(counts.values())
+                hits = counts["memory_hits"] + counts["disk_hits"]
+                report[namespace] = {**counts, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+            return report
+
+    def log_stats(self):
+        for namespace, counts in self.stats().items():
+            logger.info(
+                f"📊 Cache '{namespace}': hit rate {counts['hit_rate']:.1%} "
+                f"(memory {counts['memory_hits']}, disk {counts['disk_hits']}, misses {counts['misses']})"
+            )
+
+
+def get_default_cache():
+    """Return the process-wide cache shared by the web app and batch runners."""
+    global _default_cache
+    if CACHE_DISABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AnswerCache()
+        return _default_cache
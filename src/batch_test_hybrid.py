@@ -1,6 +1,7 @@
 import csv
 import logging
-from travelbot import hybrid_response  # Import the hybrid function
+from travelbot import hybrid_response, load_model_and_retriever, retrieve_scored_batch  # Import the hybrid function
+from answer_cache import get_default_cache
 
 # --- Configuration ---
 INPUT_FILE = "test_prompts.txt"
@@ -36,13 +37,22 @@ def write_results(output_file, results):
     except Exception as e:
         logger.error(f"Error writing to output file: {e}")
 
-def process_prompts(prompts):
+def process_prompts(prompts, llm, retriever, cache=None):
     """Process each prompt using the hybrid_response function."""
+    # Embed and search every prompt in one batch up front
+    logger.info(f"🔍 Retrieving chunks for {len(prompts)} prompts in one batch...")
+    try:
+        retrieved = retrieve_scored_batch(prompts, retriever, cache)
+    except Exception as e:
+        # Fall back to retrieving inside each prompt's own try, so one bad prompt can't fail the run
+        logger.error(f"Batched retrieval failed, retrieving per prompt: {e}")
+        retrieved = [None] * len(prompts)
+
     results = []
-    for prompt in prompts:
+    for prompt, scored in zip(prompts, retrieved):
         try:
             logger.info(f"🔍 Processing: {prompt}")
-            response = hybrid_response(prompt)
+            response = hybrid_response(prompt, llm, retriever, cache, scored=scored)
             results.append((prompt, response))
         except Exception as e:
             logger.error(f"Error processing prompt '{prompt}': {e}")
@@ -57,8 +67,12 @@ def main():
         logger.error("No prompts to process. Exiting.")
         return
 
-    results = process_prompts(prompts)
+    llm, retriever = load_model_and_retriever()
+    cache = get_default_cache()
+    results = process_prompts(prompts, llm, retriever, cache)
     write_results(OUTPUT_FILE, results)
+    if cache is not None:
+        cache.log_stats()
     logger.info("✅ Batch processing complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+import csv
+import time
+import logging
+import argparse
+from collections import Counter
+from travelbot import answer_query, load_model_and_retriever
+from bench_utils import load_prompts, percentile
+
+# --- Configuration ---
+INPUT_FILE = "test_prompts.txt"
+OUTPUT_FILE = "adaptive_benchmark.csv"
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def run_mode(prompts, llm, retriever, adaptive):
+    """Answer every prompt once (uncached) and record latency and path."""
+    rows = []
+    for prompt in prompts:
+        start_time = time.perf_counter()
+        result = answer_query(prompt, llm, retriever, cache=None, adaptive=adaptive)
+        latency = time.perf_counter() - start_time
+        top_score = result["scores"][0] if result["scores"] else ""
+        rows.append(("adaptive" if adaptive else "baseline", prompt, result["path"], top_score, round(latency, 4)))
+    return rows
+
+def summarize(rows):
+    """Log the latency distribution per mode/path and how often each path was taken."""
+    for mode in ("baseline", "adaptive"):
+        mode_rows = [row for row in rows if row[0] == mode]
+        if not mode_rows:
+            continue
+        latencies = [row[4] for row in mode_rows]
+        logger.info(
+            f"📊 {mode}: p50={percentile(latencies, 50):.3f}s p90={percentile(latencies, 90):.3f}s "
+            f"p99={percentile(latencies, 99):.3f}s mean={sum(latencies) / len(latencies):.3f}s"
+        )
+        paths = Counter(row[2] for row in mode_rows)
+        for path, count in paths.most_common():
+            path_latencies = [row[4] for row in mode_rows if row[2] == path]
+            logger.info(
+                f"   {path:<8} {count:>4} ({count / len(mode_rows):.0%})  "
+                f"p50={percentile(path_latencies, 50):.3f}s p90={percentile(path_latencies, 90):.3f}s"
+            )
+
+def main():
+    """Compare the full pipeline against confidence-adaptive mode."""
+    parser = argparse.ArgumentParser(description="Benchmark confidence-adaptive answering.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.input)
+    llm, retriever = load_model_and_retriever()
+    answer_query(prompts[0], llm, retriever, adaptive=False)  # warm up model and index
+
+    rows = run_mode(prompts, llm, retriever, adaptive=False) + run_mode(prompts, llm, retriever, adaptive=True)
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Mode", "Prompt", "Path", "Top Similarity", "Latency (s)"])
+        writer.writerows(rows)
+    logger.info(f"Results saved to {args.output}")
+    summarize(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import csv
+import json
+import logging
+import argparse
+import urllib.parse
+from bench_utils import fetch, load_prompts
+
+# --- Configuration ---
+INPUT_FILE = "test_prompts.txt"
+OUTPUT_FILE = "api_payload_benchmark.csv"
+BASE_URL = "http://127.0.0.1:8000"
+ENCODINGS = ["identity", "gzip", "br"]
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def main():
+    """Compare the HTML form endpoint with /api/ask for payload size and latency."""
+    parser = argparse.ArgumentParser(description="Benchmark payload size and latency of the answer endpoints.")
+    parser.add_argument("--url", default=BASE_URL, help="Base URL of a running web app.")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    endpoints = {
+        "form (POST /)": lambda q: (f"{args.url}/", urllib.parse.urlencode({"query": q}).encode("utf-8"),
+                                    "application/x-www-form-urlencoded"),
+        "json (POST /api/ask)": lambda q: (f"{args.url}/api/ask", json.dumps({"query": q}).encode("utf-8"),
+                                           "application/json"),
+    }
+
+    prompts = load_prompts(INPUT_FILE)
+    rows = []
+    for prompt in prompts:
+        for name, build in endpoints.items():
+            fetch(*build(prompt), "identity")  # first call warms the answer caches
+            for encoding in ENCODINGS:
+                size, served, seconds = fetch(*build(prompt), encoding)
+                rows.append((prompt, name, encoding, served, size, round(seconds, 4)))
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Prompt", "Endpoint", "Accept-Encoding", "Content-Encoding", "Bytes", "Latency (s)"])
+        writer.writerows(rows)
+    logger.info(f"Results saved to {args.output}")
+
+    baseline = [row for row in rows if row[1].startswith("form") and row[2] == "identity"]
+    base_bytes = sum(row[4] for row in baseline) / len(baseline)
+    base_latency = sum(row[5] for row in baseline) / len(baseline)
+    for name in endpoints:
+        for encoding in ENCODINGS:
+            subset = [row for row in rows if row[1] == name and row[2] == encoding]
+            avg_bytes = sum(row[4] for row in subset) / len(subset)
+            avg_latency = sum(row[5] for row in subset) / len(subset)
+            logger.info(
+                f"📊 {name:<22} {encoding:<8} {avg_bytes:>9.0f} B ({1 - avg_bytes / base_bytes:+.0%} smaller) "
+                f"{avg_latency * 1000:>7.1f} ms ({1 - avg_latency / base_latency:+.0%} faster)"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import csv
+import time
+import logging
+import argparse
+from retrieval import ENCODER, load_vectorstore, search_batch_with_ids, search_with_ids
+from bench_utils import load_prompts
+
+# --- Configuration ---
+INPUT_FILE = "test_prompts.txt"
+OUTPUT_FILE = "batch_retrieval_benchmark.csv"
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+VECTOR_DB_PATH = "vectordb_retrain"
+INDEX_NAME = "travelbot_retrain"
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def make_queries(prompts, count):
+    """Build count distinct queries by cycling the prompt list."""
+    return [f"{prompts[i % len(prompts)]} ({i})" for i in range(count)]
+
+def measure(fn, repeats):
+    """Best-of-N wall time for fn()."""
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def main():
+    """Compare per-query retrieval against the batched API at increasing batch sizes."""
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-query retrieval.")
+    parser.add_argument("--db-path", default=VECTOR_DB_PATH)
+    parser.add_argument("--index-name", default=INDEX_NAME)
+    parser.add_argument("--encoder", default=ENCODER)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    vectorstore = load_vectorstore(args.db_path, args.index_name, encoder=args.encoder)
+    prompts = load_prompts(INPUT_FILE)
+    search_batch_with_ids(vectorstore, prompts[:1], args.k)  # warm up encoder
+
+    results = []
+    for size in BATCH_SIZES:
+        queries = make_queries(prompts, size)
+        sequential = measure(lambda: [search_with_ids(vectorstore, q, args.k) for q in queries], args.repeats)
+        batched = measure(lambda: search_batch_with_ids(vectorstore, queries, args.k), args.repeats)
+        results.append((
+            size,
+            round(sequential, 4), round(size / sequential, 1),
+            round(batched, 4), round(size / batched, 1),
+            round(sequential / batched, 2),
+        ))
+        logger.info(f"📊 batch={size:>3}: {results[-1][2]} q/s sequential, {results[-1][4]} q/s batched "
+                    f"({results[-1][5]}x)")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Batch Size", "Sequential (s)", "Sequential (q/s)", "Batched (s)", "Batched (q/s)", "Speedup"])
+        writer.writerows(results)
+    logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
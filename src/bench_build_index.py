@@ -0,0 +1,64 @@
+import os
+import csv
+import sys
+import time
+import logging
+import argparse
+from langchain.docstore.document import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import build_index
+
+# --- Configuration ---
+OUTPUT_FILE = "build_index_benchmark.csv"
+CORPUS_CHUNKS = 100_000
+WORKER_COUNTS = [1, 2, 4, 8]
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def synthetic_chunks(count):
+    """Chunks of roughly CHUNK_SIZE characters, each with distinct text."""
+    return [
+        Document(
+            page_content=" ".join(f"Paragraph {n}.{i}: the member is authorized per diem, TLE and DLA under JTR 0502."
+                                  for i in range(6)),
+            metadata={"source": f"synthetic_chunk{n}.txt"},
+        )
+        for n in range(count)
+    ]
+
+def main():
+    """Report index build time against the number of embedding workers."""
+    parser = argparse.ArgumentParser(description="Benchmark sharded index builds against worker count.")
+    parser.add_argument("--chunks", type=int, default=CORPUS_CHUNKS)
+    parser.add_argument("--workers", nargs="*", type=int, default=WORKER_COUNTS)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    results, reference_ids = [], None
+    for workers in args.workers:
+        logger.info(f"🚀 Embedding {len(chunks)} chunks with {workers} worker(s)...")
+        start_time = time.perf_counter()
+        db = build_index.embed_chunks(chunks, workers)
+        seconds = time.perf_counter() - start_time
+
+        # Every worker count must produce the same index order.
+        if reference_ids is None:
+            reference_ids = db.index_to_docstore_id
+        elif db.index_to_docstore_id != reference_ids:
+            raise RuntimeError(f"Index order with {workers} workers differs from the first run")
+
+        results.append((workers, len(chunks), round(seconds, 1), round(len(chunks) / seconds, 1)))
+        logger.info(f"📊 {seconds:.1f}s ({results[-1][3]} chunks/s, x{results[0][2] / seconds:.2f})")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Workers", "Chunks", "Time (s)", "Chunks/s"])
+        writer.writerows(results)
+    logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
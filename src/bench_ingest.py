@@ -0,0 +1,75 @@
+import os
+import csv
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import subprocess
+
+# --- Configuration ---
+OUTPUT_FILE = "ingest_memory_benchmark.csv"
+CORPUS_PAGES = [500, 2000, 8000, 32000]
+MODES = ["streaming", "in-memory"]
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Each case runs in a fresh interpreter so ru_maxrss is the peak for that case alone.
+CHILD = """
+import sys, json, time, resource
+sys.path.insert(0, {src!r})
+from langchain.docstore.document import Document
+import ingest
+
+def pages():
+    for n in range({pages}):
+        text = " ".join(f"Paragraph {{n}}.{{i}}: the member is authorized per diem, TLE and DLA under JTR 0502." for i in range(30))
+        yield Document(page_content=text, metadata={{"source": "synthetic.pdf", "page": n}})
+
+start = time.time()
+embeddings = ingest.create_embeddings(False)
+chunks = ingest.iter_chunks(pages(), ingest.CHUNK_SIZE, ingest.CHUNK_OVERLAP)
+if {mode!r} == "streaming":
+    count = ingest.ingest(chunks, embeddings, {out!r}, "bench", "bench-{pages}")
+else:
+    chunks = list(chunks)
+    count = len(chunks)
+    ingest.FAISS.from_documents(chunks, embeddings).save_local({out!r}, index_name="bench")
+print(json.dumps({{"chunks": count, "seconds": time.time() - start,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+def run_case(mode, pages):
+    """Ingest a synthetic corpus of the given size and return its peak RSS."""
+    src = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as out:
+        code = CHILD.format(src=src, pages=pages, mode=mode, out=out)
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return (mode, pages, report["chunks"], round(report["peak_rss_mb"], 1), round(report["seconds"], 1))
+
+def main():
+    """Report peak RSS against corpus size for streaming vs all-in-memory ingestion."""
+    parser = argparse.ArgumentParser(description="Benchmark ingestion peak memory against corpus size.")
+    parser.add_argument("--pages", nargs="*", type=int, default=CORPUS_PAGES)
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=MODES)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        for pages in args.pages:
+            logger.info(f"🚀 Ingesting {pages} pages ({mode})...")
+            results.append(run_case(mode, pages))
+            logger.info(f"📊 {results[-1][2]} chunks, peak RSS {results[-1][3]} MB, {results[-1][4]}s")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Mode", "Pages", "Chunks", "Peak RSS (MB)", "Time (s)"])
+        writer.writerows(results)
+    logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
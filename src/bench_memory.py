@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import subprocess
+from bench_utils import load_prompts
+
+# --- Configuration ---
+INPUT_FILE = "test_prompts.txt"
+BASELINE_FILE = "memory_baseline.json"
+THRESHOLD = float(os.environ.get("TRAVELBOT_MEMORY_THRESHOLD", "0.10"))  # allowed peak RSS growth (fraction)
+MIN_REGRESSION_MB = 5.0  # growth below this is noise, whatever the percentage
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# The workload runs in a fresh interpreter with profiling on: model startup,
+# every prompt through hybrid_response, and the form template render.
+CHILD = """
+import sys, json
+sys.path.insert(0, {src!r})
+from jinja2 import Environment, FileSystemLoader
+from profiling import profiler, stage
+import travelbot
+
+llm, retriever = travelbot.load_model_and_retriever()
+template = Environment(loader=FileSystemLoader({templates!r})).get_template("form.html")
+for prompt in {prompts!r}:
+    answer = travelbot.hybrid_response(prompt, llm, retriever, adaptive=False)
+    with stage("web.render"):
+        template.render(request=None, answer=answer, query=prompt)
+profiler.write_report()
+"""
+
+def run_workload(prompts, report_path):
+    """Profile the startup and answer path in a subprocess and return its report."""
+    src = os.path.dirname(os.path.abspath(__file__))
+    root = os.path.dirname(src)
+    env = dict(os.environ, TRAVELBOT_PROFILE="1", TRAVELBOT_PROFILE_REPORT=report_path, TRAVELBOT_CACHE_DISABLED="1")
+    code = CHILD.format(src=src, templates=os.path.join(root, "templates"), prompts=prompts)
+    subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True)
+    with open(report_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def peaks(report):
+    """{"total": peak, stage name: peak, ...} in MB."""
+    return {"total": report["peak_rss_mb"], **{name: s["peak_rss_mb"] for name, s in report["stages"].items()}}
+
+def regressions(current, baseline, threshold, min_mb=MIN_REGRESSION_MB):
+    """Return (name, baseline MB, current MB) for every peak that grew past the threshold."""
+    return [
+        (name, baseline[name], mb)
+        for name, mb in current.items()
+        if name in baseline and mb - baseline[name] > max(baseline[name] * threshold, min_mb)
+    ]
+
+def main():
+    """Profile the answer path and fail when peak memory regresses past the baseline."""
+    parser = argparse.ArgumentParser(description="Memory regression check for startup and the answer path.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline report to compare against.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed peak RSS growth, e.g. 0.10 for 10%%.")
+    parser.add_argument("--report", help="Also keep the full profiling report at this path.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's report as the new baseline.")
+    args = parser.parse_args()
+
+    prompts = load_prompts(INPUT_FILE)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run_workload(prompts, args.report or os.path.join(tmp, "profile_report.json"))
+
+    current = peaks(report)
+    for name, mb in current.items():
+        logger.info(f"📊 {name:<22} peak RSS {mb:>9.1f} MB")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        # A missing baseline must not pass silently: CI would compare against nothing.
+        logger.error(f"❌ No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 1
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = peaks(json.load(f))
+    failed = regressions(current, baseline, args.threshold)
+    for name, before, after in failed:
+        logger.error(f"❌ {name}: peak RSS {before:.1f} MB -> {after:.1f} MB (+{after / before - 1:.0%})")
+    if failed:
+        return 1
+    logger.info(f"✅ Peak memory within {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import csv
+import json
+import time
+import pickle
+import random
+import logging
+import argparse
+from paragraph_index import lookup, lookup_path, publication_name, write_lookup
+
+# --- Configuration ---
+OUTPUT_FILE = "paragraph_lookup_benchmark.csv"
+VECTOR_DB_PATH = "vectordb"
+INDEX_NAME = "travelbot"
+SAMPLE_SIZE = 200
+K = 3
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Question templates for each kind of heading, filled with (publication, number).
+TEMPLATES = {
+    "para": "What does {pub} paragraph {number} say?",
+    "table": "Show me {pub} Table {number}",
+    "chapter": "Summarize {pub} chapter {number}",
+}
+
+def heading_lines(text):
+    """Yield (kind, number, heading line) for lines that open with a paragraph or table number and a title."""
+    for line in text.split("\n"):
+        words = line.split()
+        if len(words) < 2:
+            continue
+        if words[0].lower() == "table" and len(words) > 2 and "-" in words[1]:
+            yield "table", words[1].rstrip("."), line.strip()
+        elif words[0].endswith(".") and words[0][:-1].replace(".", "").isdigit() and words[1][:1].isupper():
+            yield "para", words[0][:-1], line.strip()
+
+def labelled_set(docstore, index_to_docstore_id, size, seed=0):
+    """Questions citing a heading, labelled with every chunk whose text contains that heading line.
+
+    Labels come from the raw text, not from paragraph_index's patterns, so
+    the lookup is scored against an independent answer key.
+    """
+    docs = [(doc_id, docstore.search(doc_id)) for doc_id in index_to_docstore_id.values()]
+    headings = {}
+    for doc_id, doc in docs:
+        for kind, number, line in heading_lines(doc.page_content):
+            pub = publication_name(doc.metadata.get("source")) or ""
+            headings.setdefault((pub, kind, number), line)
+    sample = random.Random(seed).sample(sorted(headings), min(size, len(headings)))
+    labels = []
+    for pub, kind, number in sample:
+        line = headings[(pub, kind, number)]
+        expected = [doc_id for doc_id, doc in docs if line in doc.page_content]
+        query = TEMPLATES[kind].format(pub=pub, number=number).replace("  ", " ")
+        labels.append({"query": query, "expected": expected})
+    return labels
+
+def score(name, search, labels, k):
+    """Return (name, hits, misses, hit rate, mean latency in ms) for a search function."""
+    hits, seconds = 0, 0.0
+    for label in labels:
+        start_time = time.perf_counter()
+        ids = search(label["query"], k)
+        seconds += time.perf_counter() - start_time
+        hits += any(doc_id in label["expected"] for doc_id in ids)
+    return (name, hits, len(labels) - hits, round(hits / len(labels), 3), round(seconds / len(labels) * 1000, 3))
+
+def main():
+    """Compare the paragraph lookup with vector search on questions that cite a paragraph or table."""
+    parser = argparse.ArgumentParser(description="Benchmark paragraph lookup latency and accuracy on a labelled set.")
+    parser.add_argument("--db", default=VECTOR_DB_PATH)
+    parser.add_argument("--index", default=INDEX_NAME)
+    parser.add_argument("--labels", help="JSONL of {\"query\", \"expected\": [docstore IDs]}; generated from the index if omitted.")
+    parser.add_argument("--size", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--k", type=int, default=K)
+    parser.add_argument("--no-vector", action="store_true", help="Skip the vector search baseline (no embedding model needed).")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    with open(os.path.join(args.db, f"{args.index}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    if not os.path.exists(lookup_path(args.db, args.index)):
+        write_lookup(docstore, index_to_docstore_id, args.db, args.index)
+
+    if args.labels:
+        with open(args.labels, "r", encoding="utf-8") as f:
+            labels = [json.loads(line) for line in f if line.strip()]
+    else:
+        labels = labelled_set(docstore, index_to_docstore_id, args.size)
+    logger.info(f"🚀 Scoring {len(labels)} labelled questions at k={args.k}...")
+
+    results = [score("paragraph lookup", lambda q, k: lookup(q, args.db, args.index, k), labels, args.k)]
+    if not args.no_vector:
+        from retrieval import load_vectorstore, search_with_ids
+
+        vectorstore = load_vectorstore(args.db, args.index)
+        results.append(score("vector search", lambda q, k: [i for i, _ in search_with_ids(vectorstore, q, k)],
+                             labels, args.k))
+    for name, hits, misses, rate, latency in results:
+        logger.info(f"📊 {name:<17} hit@{args.k} {rate:.1%} ({hits}/{hits + misses}), {latency:.3f} ms/query")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Method", "Hits", "Misses", f"Hit@{args.k}", "Latency (ms)"])
+        writer.writerows(results)
+    logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import csv
+import sys
+import json
+import logging
+import argparse
+import subprocess
+
+# --- Configuration ---
+OUTPUT_FILE = "registry_memory_benchmark.csv"
+MODES = ["registry", "separate"]
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# The combined workload loads what web_app, a batch evaluation, simplebot,
+# chunkbot and an index build would each load, all in one process. In
+# "separate" mode the registry forgets its models between entry points, so
+# every entry point loads its own copy the way the bots did before the registry.
+CHILD = """
+import sys, json, resource
+sys.path.insert(0, {src!r})
+from model_registry import registry
+import travelbot, simplebot, retrieval, ingest
+
+def entry_point(load):
+    if {mode!r} == "separate":
+        registry.clear()
+    return load()
+
+held = [
+    entry_point(travelbot.load_model_and_retriever),        # web_app
+    entry_point(travelbot.load_model_and_retriever),        # batch_test
+    entry_point(lambda: simplebot.setup_model(simplebot.MODEL_ID)),
+    entry_point(lambda: retrieval.create_query_embeddings(retrieval.EMBEDDING_MODEL, "sentence-transformers")),
+    entry_point(lambda: ingest.create_embeddings(False)),   # index builder
+]
+print(json.dumps({{"loaded": len(registry.loaded()),
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+def run_case(mode):
+    """Run the combined workload in a fresh interpreter and return its peak RSS."""
+    src = os.path.dirname(os.path.abspath(__file__))
+    code = CHILD.format(src=src, mode=mode)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    """Report the RSS saved by sharing models through the registry."""
+    parser = argparse.ArgumentParser(description="Benchmark peak RSS of the combined workload with and without the model registry.")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in MODES:
+        logger.info(f"🚀 Running combined workload ({mode})...")
+        results[mode] = run_case(mode)
+        logger.info(f"📊 {mode}: peak RSS {results[mode]['peak_rss_mb']:.1f} MB")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Mode", "Peak RSS (MB)"])
+        for mode in MODES:
+            writer.writerow([mode, round(results[mode]["peak_rss_mb"], 1)])
+    logger.info(f"Results saved to {args.output}")
+
+    saved = results["separate"]["peak_rss_mb"] - results["registry"]["peak_rss_mb"]
+    logger.info(f"📊 Registry saves {saved:.1f} MB ({saved / results['separate']['peak_rss_mb']:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import time
+import urllib.request
+
+# Helpers shared by the bench_*.py scripts, so no benchmark imports another.
+
+DEFAULT_PROMPTS = [
+    "What is my per diem rate for a TDY?",
+    "Am I authorized dislocation allowance on a PCS?",
+    "How many days of TLE can I claim?",
+    "Can I get reimbursed for a rental car on TDY?",
+]
+
+def load_prompts(file_path):
+    """Load prompts from the input file, falling back to a small built-in set."""
+    if os.path.exists(file_path):
+        with open(file_path, "r") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        if prompts:
+            return prompts
+    return DEFAULT_PROMPTS
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def fetch(url, data, content_type, encoding="identity"):
+    """Send one request; return (bytes on the wire, Content-Encoding, seconds)."""
+    request = urllib.request.Request(url, data=data, headers={
+        "Content-Type": content_type,
+        "Accept-Encoding": encoding,
+    })
+    start_time = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=600) as response:
+        body = response.read()  # urllib does not decompress, so this is the transferred size
+        served_encoding = response.headers.get("Content-Encoding", "identity")
+    return len(body), served_encoding, time.perf_counter() - start_time
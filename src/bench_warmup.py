@@ -0,0 +1,97 @@
+import os
+import csv
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from bench_utils import fetch, percentile
+from warmup import QUESTION_LOG, WARMUP_QUESTIONS, parse_question_log
+
+# --- Configuration ---
+OUTPUT_FILE = "warmup_benchmark.csv"
+PORT = 8011
+REQUESTS = 200  # replayed "first hour" requests per run
+STARTUP_TIMEOUT = 900
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def first_hour_traffic(path, count, seed=0):
+    """Sample requests from the question log in proportion to how often each was asked."""
+    questions = [question for question, _, _ in parse_question_log(path)]
+    if not questions:
+        raise SystemExit(f"No questions in {path}")
+    return random.Random(seed).choices(questions, k=count)
+
+def run_case(warmup_questions, traffic, port, log_path=QUESTION_LOG):
+    """Start a fresh web app with an empty cache, replay the traffic and return its latencies."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm up from a copy of the log: /api/ask appends every replayed question
+        # to it, which would skew the real log and the next run's ranking.
+        run_log = os.path.join(tmp, "questions.txt")
+        shutil.copyfile(log_path, run_log)
+        env = dict(os.environ,
+                   TRAVELBOT_CACHE_PATH=os.path.join(tmp, "cache.sqlite"),
+                   TRAVELBOT_QUESTION_LOG=run_log,
+                   TRAVELBOT_WARMUP_QUESTIONS=str(warmup_questions))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "web_app:app", "--app-dir", "src", "--port", str(port)],
+            cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            start_time = time.perf_counter()
+            while True:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5):
+                        break
+                except OSError:
+                    if server.poll() is not None or time.perf_counter() - start_time > STARTUP_TIMEOUT:
+                        raise RuntimeError("web app did not start")
+                    time.sleep(1)
+            ready_seconds = time.perf_counter() - start_time
+
+            latencies = []
+            for query in traffic:
+                _, _, seconds = fetch(f"http://127.0.0.1:{port}/api/ask",
+                                      json.dumps({"query": query}).encode("utf-8"), "application/json", "identity")
+                latencies.append(seconds)
+            return ready_seconds, latencies
+        finally:
+            server.terminate()
+            server.wait()
+
+def main():
+    """Compare post-restart latency with and without cache warmup."""
+    parser = argparse.ArgumentParser(description="Benchmark first-hour latency after a restart with and without warmup.")
+    parser.add_argument("--log", default=QUESTION_LOG, help="Question log to replay.")
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--warmup-questions", type=int, default=WARMUP_QUESTIONS)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    traffic = first_hour_traffic(args.log, args.requests)
+    rows = []
+    for name, questions in (("cold", 0), ("warmup", args.warmup_questions)):
+        logger.info(f"🚀 Restarting web app ({name})...")
+        ready_seconds, latencies = run_case(questions, traffic, args.port, args.log)
+        rows.append((name, round(ready_seconds, 1), len(latencies),
+                     round(percentile(latencies, 50) * 1000, 1), round(percentile(latencies, 95) * 1000, 1)))
+        logger.info(f"📊 {name}: ready in {rows[-1][1]}s, p50 {rows[-1][3]} ms, p95 {rows[-1][4]} ms")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Mode", "Ready (s)", "Requests", "p50 (ms)", "p95 (ms)"])
+        writer.writerows(rows)
+    logger.info(f"Results saved to {args.output}")
+    logger.info(f"📊 Warmup changes first-hour p95 by {1 - rows[1][4] / rows[0][4]:+.0%}")
+
+if __name__ == "__main__":
+    main()
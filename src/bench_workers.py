@@ -0,0 +1,132 @@
+import os
+import csv
+import sys
+import time
+import logging
+import argparse
+import subprocess
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from bench_utils import load_prompts
+
+# --- Configuration ---
+INPUT_FILE = "test_prompts.txt"
+OUTPUT_FILE = "worker_benchmark.csv"
+WORKER_COUNTS = [1, 2, 4, 8]
+MODES = ["ipc", "preload"]
+STARTUP_TIMEOUT = 900
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+def process_tree(root_pid):
+    """Return the pid of a process and all of its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+def memory_usage_mb(root_pid):
+    """Sum RSS and PSS (kB fields in smaps_rollup) over a process tree, in MB.
+
+    RSS double-counts pages shared between forked workers; PSS splits shared
+    pages between the processes mapping them, so it reflects real footprint.
+    """
+    rss = pss = 0
+    for pid in process_tree(root_pid):
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return round(rss / 1024, 1), round(pss / 1024, 1)
+
+def wait_until_ready(url, proc):
+    """Poll the form page until the server answers."""
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("Server exited during startup.")
+        try:
+            with urllib.request.urlopen(url, timeout=5):
+                return
+        except OSError:
+            time.sleep(2)
+    raise TimeoutError(f"Server did not become ready within {STARTUP_TIMEOUT}s.")
+
+def ask(url, prompt):
+    """POST one question through the HTML form endpoint."""
+    data = urllib.parse.urlencode({"query": prompt}).encode("utf-8")
+    with urllib.request.urlopen(url, data=data, timeout=600) as response:
+        response.read()
+
+def run_case(mode, workers, prompts, requests, port):
+    """Start the server in one configuration and measure memory and throughput."""
+    url = f"http://127.0.0.1:{port}/"
+    proc = subprocess.Popen([
+        sys.executable, "src/main.py", "server",
+        "--serve-mode", mode, "--workers", str(workers), "--port", str(port),
+    ])
+    try:
+        wait_until_ready(url, proc)
+        idle_rss, idle_pss = memory_usage_mb(proc.pid)
+
+        queries = [prompts[i % len(prompts)] for i in range(requests)]
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            list(pool.map(lambda q: ask(url, q), queries))
+        elapsed = time.time() - start_time
+
+        loaded_rss, loaded_pss = memory_usage_mb(proc.pid)
+        return (mode, workers, idle_rss, idle_pss, loaded_rss, loaded_pss,
+                round(requests / elapsed, 3), round(elapsed, 2))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+def main():
+    """Compare shared-model serving modes across worker counts."""
+    parser = argparse.ArgumentParser(description="Benchmark RSS and throughput for multi-worker serving.")
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=MODES)
+    parser.add_argument("--workers", nargs="*", type=int, default=WORKER_COUNTS)
+    parser.add_argument("--requests", type=int, default=32, help="Requests fired per configuration.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    prompts = load_prompts(INPUT_FILE)
+    results = []
+    for mode in args.modes:
+        for workers in args.workers:
+            logger.info(f"🚀 Benchmarking mode={mode} workers={workers}...")
+            results.append(run_case(mode, workers, prompts, args.requests, args.port))
+            logger.info(f"✅ {results[-1]}")
+
+    with open(args.output, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Mode", "Workers", "Idle RSS (MB)", "Idle PSS (MB)",
+                         "Loaded RSS (MB)", "Loaded PSS (MB)", "Throughput (req/s)", "Wall Time (s)"])
+        writer.writerows(results)
+    logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,36 @@
-import os
-import re
+import argparse
 import logging
-import torch
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-from langchain_community.llms import HuggingFacePipeline
+from retrieval import ENCODER, load_vectorstore, retrieve_chunks
+from safety import SENSITIVE_INPUT_WARNING, detect_pii_or_opsec
+from warmup import EXIT_COMMANDS, log_user_question
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-from datetime import datetime
-
-SAMPLE_QUESTIONS_FILE = os.path.join("context", "sample_questions.txt")
-
-def log_user_question(question, mode="chunk"):
-    """Log user questions to the sample_questions.txt file."""
-    try:
-        if os.path.exists(SAMPLE_QUESTIONS_FILE):
-            with open(SAMPLE_QUESTIONS_FILE, "r", encoding="utf-8") as f:
-                if question.strip() in f.read():
-                    return
-
-        with open(SAMPLE_QUESTIONS_FILE, "a", encoding="utf-8") as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"Q: {question.strip()} (Asked on {timestamp}, Mode: {mode})\n")
-        logger.info(f"✅ Logged question: {question}")
-    except Exception as e:
-        logger.error(f"❌ Failed to log question: {e}")
-
-
-# --- PII/OPSEC Detection ---
-def detect_pii_or_opsec(text):
-    """Detect sensitive information in the input text."""
-    safe_context_words = ["location", "airport", "TDY", "PCS", "JTR"]
-    if any(word.lower() in text.lower() for word in safe_context_words):
-        return False
-
-    patterns = [
-        r"\b\d{3}-\d{2}-\d{4}\b",  # SSN
-        r"\b\d{10}\b",  # 10-digit phone number
-        r"\(\d{3}\)\s*\d{3}-\d{4}",  # (123) 456-7890
-        r"\b\d{2}[-/]\d{2}[-/]\d{4}\b",  # DOB
-        r"\b[A-Z]{2,6}\d{4,7}\b",  # DoD ID or tail number
-        r"\b(classified|secret|OPSEC|grid ref|coordinates)\b"  # OPSEC terms
-    ]
-    return any(re.search(p, text, re.IGNORECASE) for p in patterns)
-
-def load_model_and_pipeline(model_id):
-    """Load the language model and pipeline."""
-    try:
-        logger.info(f"📚 Loading model: {model_id}")
-        tokenizer = AutoTokenizer.from_pretrained(model_id)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_id)
-        pipe = pipeline(
-            "text2text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            max_new_tokens=256,
-            do_sample=True,
-            temperature=0.7,
-            repetition_penalty=1.2,
-            top_k=50,
-            top_p=0.95
-        )
-        llm = HuggingFacePipeline(pipeline=pipe)
-        logger.info("✅ Model loaded successfully.")
-        return llm
-    except Exception as e:
-        logger.error(f"Error loading model: {e}")
-        raise
-
-def load_retriever(db_path, embeddings_model):
-    """Load the FAISS retriever."""
+def load_retriever(db_path, embeddings_model, encoder=ENCODER):
+    """Load the FAISS store with only the embedding model (no generation stack)."""
     try:
-        logger.info(f"🔍 Loading vector database from: {db_path}")
-        retriever = FAISS.load_local(
-            db_path,
-            HuggingFaceEmbeddings(model_name=embeddings_model),
-            index_name="travelbot",
-            allow_dangerous_deserialization=True
-        ).as_retriever(search_type="similarity", search_kwargs={"k": 3})
+        vectorstore = load_vectorstore(db_path, "travelbot", embeddings_model, encoder)
         logger.info("✅ Vector database loaded successfully.")
-        return retriever
+        return vectorstore
     except Exception as e:
         logger.error(f"Error loading vector database: {e}")
         raise
 
 def main():
     """Main function to run the ChunkBot."""
-    model_id = "google/flan-t5-base"
+    parser = argparse.ArgumentParser(description="ChunkBot - retrieval-only regulation search")
+    parser.add_argument("--encoder", choices=["auto", "fastembed", "sentence-transformers"], default=ENCODER,
+                        help="Query encoder backend; 'auto' prefers the lightweight fastembed ONNX encoder.")
+    args = parser.parse_args()
+
     db_path = "vectordb"
     embeddings_model = "sentence-transformers/all-MiniLM-L6-v2"
 
-    # Load model and retriever
-    llm = load_model_and_pipeline(model_id)
-    retriever = load_retriever(db_path, embeddings_model)
+    # Retrieval only: no language model is loaded in chunk mode
+    vectorstore = load_retriever(db_path, embeddings_model, args.encoder)
 
     logger.info("✅ ChunkBot is ready. Ask your PCS/TDY travel questions.")
     print("🔐 [SECURITY NOTICE] Do not enter names, SSNs, DOBs, addresses, or OPSEC-sensitive information.")
@@ -105,25 +38,25 @@ def main():
     while True:
         try:
             query = input("\n> ")
-            log_user_question(query, mode="chunk")
-            if query.lower() in ["exit", "quit"]:
+            if query.strip().lower() in EXIT_COMMANDS:
                 logger.info("Exiting ChunkBot. Goodbye!")
                 break
 
-            if detect_pii_or_opsec(query):
-                print("⚠️ Input may contain sensitive information. Please rephrase your question.")
+            if detect_pii_or_opsec(query, check_names=False):
+                print(SENSITIVE_INPUT_WARNING)
                 continue
+            log_user_question(query, mode="chunk")
 
             logger.info("🔍 Retrieving relevant chunk content...")
-            docs = retriever.get_relevant_documents(query)
+            chunks = retrieve_chunks(query, k=3, vectorstore=vectorstore)
 
-            if not docs:
+            if not chunks:
                 print("⚠️ No relevant documents found. Please try rephrasing your question.")
                 continue
 
-            for i, doc in enumerate(docs, 1):
-                print(f"\n📄 Source {i}: {doc.metadata['source']}")
-                print(doc.page_content.strip())
+            for i, chunk in enumerate(chunks, 1):
+                print(f"\n📄 Source {i}: {chunk['source']}")
+                print(chunk["text"])
         except Exception as e:
             logger.error(f"An error occurred: {e}")
             print("⚠️ An error occurred. Please try again.")
@@ -0,0 +1,72 @@
+import os
+import time
+import threading
+
+# --- Configuration ---
+REQUEST_DEADLINE = float(os.environ.get("TRAVELBOT_REQUEST_DEADLINE", "30"))  # seconds per request, 0 = none
+
+
+class Deadline:
+    """Time budget for one request that can also be cancelled early.
+
+    Generation checks expired() between tokens, so either the budget running
+    out or cancel() (e.g. the HTTP client disconnected) stops it promptly.
+    """
+
+    def __init__(self, seconds=None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self._cancelled = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the request and run any registered cancel callbacks once."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Run callback when the deadline is cancelled (immediately if it already was)."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remaining(self):
+        """Seconds left, or None when there is no time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.cancelled or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+
+class DeadlineStoppingCriteria:
+    """transformers stopping criterion that ends generation once a Deadline expires."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if not self.triggered and self.deadline.expired():
+            self.triggered = True
+        if hasattr(input_ids, "new_full"):
+            # Recent transformers versions expect one bool per sequence in the batch.
+            return input_ids.new_full((input_ids.shape[0],), int(self.triggered)).bool()
+        return self.triggered
+
+
+def request_deadline():
+    """Deadline for an incoming request, using the configured per-request budget."""
+    return Deadline(REQUEST_DEADLINE or None)
@@ -1,88 +1,224 @@
 import os
+import json
+import queue
+import shutil
+import hashlib
 import logging
+import argparse
+import threading
+from itertools import islice
 from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings.ollama import OllamaEmbeddings
-from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import FAISS
+from model_registry import registry
+from paragraph_index import save_lookup
 
 # --- Configuration ---
 USE_OLLAMA = False  # Must match app.py
 DATA_DIR = "data"
 VECTOR_DB_PATH = "vectordb"
 INDEX_NAME = "travelbot"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 64   # chunks embedded and added to the index at a time
+QUEUE_SIZE = 4          # items buffered between pipeline stages
+CHECKPOINT_EVERY = 10   # embedding batches between index snapshots
+CHECKPOINT_FILE = "checkpoint.json"
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def load_documents(data_dir):
-    """Load documents from the specified directory."""
-    docs = []
+# Ingestion is a chain of generators: PDFs -> pages -> chunks -> embedding
+# batches -> incremental FAISS adds. Each stage runs ahead of the next by at
+# most QUEUE_SIZE items, so memory is bounded by the batch size rather than the
+# corpus size. Every CHECKPOINT_EVERY batches the partial index is snapshotted
+# so an interrupted run resumes from the last committed batch.
+
+# --- Pipeline Stages ---
+def list_pdfs(data_dir):
+    """Return the PDF paths in data_dir in a stable order."""
     if not os.path.exists(data_dir):
         logger.error(f"Data directory '{data_dir}' does not exist.")
-        return docs
-
-    for file in os.listdir(data_dir):
-        if file.endswith(".pdf"):
-            try:
-                logger.info(f"📄 Loading file: {file}")
-                loader = PyPDFLoader(os.path.join(data_dir, file))
-                docs.extend(loader.load())
-            except Exception as e:
-                logger.error(f"Error loading file '{file}': {e}")
-    if not docs:
-        logger.warning("No documents found in the data directory.")
-    return docs
-
-def split_documents(docs, chunk_size, chunk_overlap):
-    """Split documents into smaller chunks."""
+        return []
+    return [os.path.join(data_dir, f) for f in sorted(os.listdir(data_dir)) if f.endswith(".pdf")]
+
+def iter_pages(pdf_paths):
+    """Yield pages one at a time from each PDF."""
+    for path in pdf_paths:
+        try:
+            logger.info(f"📄 Loading file: {os.path.basename(path)}")
+            yield from PyPDFLoader(path).lazy_load()
+        except Exception as e:
+            logger.error(f"Error loading file '{path}': {e}")
+
+def iter_chunks(pages, chunk_size, chunk_overlap):
+    """Split pages into chunks as they arrive."""
     splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    chunks = splitter.split_documents(docs)
-    logger.info(f"✅ Split {len(docs)} documents into {len(chunks)} chunks.")
-    return chunks
+    for page in pages:
+        yield from splitter.split_documents([page])
+
+def iter_batches(items, batch_size):
+    """Group an iterable into lists of at most batch_size items."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def iter_embedded(batches, embeddings):
+    """Embed each batch of chunks, yielding (chunks, vectors)."""
+    for batch in batches:
+        yield batch, embeddings.embed_documents([chunk.page_content for chunk in batch])
+
+def bounded(iterable, maxsize=QUEUE_SIZE):
+    """Run iterable in a background thread, buffering at most maxsize items."""
+    buffer = queue.Queue(maxsize=maxsize)
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                buffer.put(item)
+        except BaseException as e:
+            buffer.put(e)
+        finally:
+            buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+# --- Checkpointing ---
+def source_fingerprint(pdf_paths, chunk_size, chunk_overlap):
+    """Identify the input so a checkpoint is only reused for the same corpus and settings."""
+    digest = hashlib.sha256(f"{chunk_size}:{chunk_overlap}".encode("utf-8"))
+    for path in pdf_paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+def load_checkpoint(work_dir, fingerprint, embeddings):
+    """Return (index, committed_chunks) from the last snapshot, or (None, 0)."""
+    path = os.path.join(work_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None, 0
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("fingerprint") != fingerprint:
+        logger.warning("⚠️ Checkpoint is for a different corpus; starting over.")
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return None, 0
+
+    db = FAISS.load_local(
+        os.path.join(work_dir, checkpoint["snapshot"]), embeddings,
+        index_name=INDEX_NAME, allow_dangerous_deserialization=True
+    )
+    logger.info(f"↩️ Resuming from checkpoint: {checkpoint['committed_chunks']} chunks already indexed.")
+    return db, checkpoint["committed_chunks"]
+
+def save_checkpoint(work_dir, fingerprint, db, committed_chunks):
+    """Snapshot the partial index, then atomically point the checkpoint file at it."""
+    snapshot = f"snapshot-{committed_chunks:09d}"
+    db.save_local(os.path.join(work_dir, snapshot), index_name=INDEX_NAME)
+
+    tmp_path = os.path.join(work_dir, CHECKPOINT_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "committed_chunks": committed_chunks, "snapshot": snapshot}, f)
+    os.replace(tmp_path, os.path.join(work_dir, CHECKPOINT_FILE))
+
+    for name in os.listdir(work_dir):
+        if name.startswith("snapshot-") and name != snapshot:
+            shutil.rmtree(os.path.join(work_dir, name), ignore_errors=True)
+
+# --- Streaming Ingestion ---
+def ingest(chunks, embeddings, vector_db_path, index_name, fingerprint,
+           batch_size=EMBED_BATCH_SIZE, checkpoint_every=CHECKPOINT_EVERY):
+    """Embed and index a stream of chunks with periodic checkpoints.
+
+    chunks must be produced in the same order on every run (it is for a given
+    fingerprint), since resuming skips the chunks already committed.
+    Returns the number of chunks in the finished index.
+    """
+    work_dir = os.path.join(vector_db_path, f"{index_name}.ingest")
+    os.makedirs(work_dir, exist_ok=True)
+    db, committed = load_checkpoint(work_dir, fingerprint, embeddings)
+
+    batches = bounded(iter_batches(islice(chunks, committed, None), batch_size))
+    since_checkpoint = 0
+    for batch, vectors in bounded(iter_embedded(batches, embeddings)):
+        pairs = list(zip((chunk.page_content for chunk in batch), vectors))
+        metadatas = [chunk.metadata for chunk in batch]
+        ids = [f"chunk-{committed + i}" for i in range(len(batch))]
+        if db is None:
+            db = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            db.add_embeddings(pairs, metadatas=metadatas, ids=ids)
+        committed += len(batch)
+
+        since_checkpoint += 1
+        if since_checkpoint >= checkpoint_every:
+            save_checkpoint(work_dir, fingerprint, db, committed)
+            since_checkpoint = 0
+            logger.info(f"💾 Checkpoint: {committed} chunks indexed.")
+
+    if db is None:
+        logger.error("No chunks to index.")
+        return 0
+
+    db.save_local(vector_db_path, index_name=index_name)
+    save_lookup(db, vector_db_path, index_name)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    logger.info(f"✅ Vector store with {committed} chunks saved to '{vector_db_path}/'")
+    return committed
 
 def create_embeddings(use_ollama):
-    """Create the embedding engine."""
+    """Create the embedding engine; release the registry's MiniLM when done with it."""
     if use_ollama:
         logger.info("🔧 Using Ollama embeddings.")
         return OllamaEmbeddings(model="tinyllama")
     else:
         logger.info("🔧 Using HuggingFace embeddings.")
-        return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        return registry.acquire(EMBEDDING_MODEL, "sentence-transformers")
 
-def save_to_faiss(chunks, embeddings, vector_db_path, index_name):
-    """Save document chunks to a FAISS vector database."""
-    try:
-        logger.info("💾 Saving chunks to FAISS vector database...")
-        db = FAISS.from_documents(chunks, embedding=embeddings)
-        db.save_local(vector_db_path, index_name=index_name)
-        logger.info(f"✅ Vector store saved to '{vector_db_path}/'")
-    except Exception as e:
-        logger.error(f"Error saving to FAISS vector database: {e}")
-
-def main():
+def main(data_dir=DATA_DIR, vector_db_path=VECTOR_DB_PATH, batch_size=EMBED_BATCH_SIZE,
+         checkpoint_every=CHECKPOINT_EVERY):
     """Main function to execute the ingestion process."""
     logger.info("🚀 Starting document ingestion...")
 
-    # Load documents
-    docs = load_documents(DATA_DIR)
-    if not docs:
+    pdf_paths = list_pdfs(data_dir)
+    if not pdf_paths:
         logger.error("No documents to process. Exiting.")
         return
 
-    # Split documents into chunks
-    chunks = split_documents(docs, CHUNK_SIZE, CHUNK_OVERLAP)
-
-    # Create embeddings
+    fingerprint = source_fingerprint(pdf_paths, CHUNK_SIZE, CHUNK_OVERLAP)
+    chunks = iter_chunks(bounded(iter_pages(pdf_paths)), CHUNK_SIZE, CHUNK_OVERLAP)
     embeddings = create_embeddings(USE_OLLAMA)
-
-    # Save chunks to FAISS vector database
-    save_to_faiss(chunks, embeddings, VECTOR_DB_PATH, INDEX_NAME)
-
+    try:
+        ingest(chunks, embeddings, vector_db_path, INDEX_NAME, fingerprint, batch_size, checkpoint_every)
+    finally:
+        if not USE_OLLAMA:
+            registry.release(EMBEDDING_MODEL, "sentence-transformers")
     logger.info("✅ Ingestion process complete.")
 
+def start_ingestion():
+    """Entry point used by `main.py ingest`."""
+    main()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Stream PDFs into the FAISS vector database.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", default=VECTOR_DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY)
+    args = parser.parse_args()
+
+    main(args.data_dir, args.output, args.batch_size, args.checkpoint_every)
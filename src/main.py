@@ -1,11 +1,90 @@
 import argparse
+import os
+import signal
+import socket
 import sys
+import time
+from profiling import profiler
 
-def run_server():
+def run_server(host="127.0.0.1", port=8000, workers=1, mode="single"):
     # Launch your FastAPI app using uvicorn
     # Adjust the module path if needed (e.g., "src.web_app:app")
     import uvicorn
-    uvicorn.run("src.web_app:app", host="127.0.0.1", port=8000, reload=True)
+    if mode == "ipc":
+        run_ipc_server(host, port, workers)
+    elif mode == "preload":
+        run_preload_server(host, port, workers)
+    else:
+        uvicorn.run("src.web_app:app", host=host, port=port, reload=True)
+
+def run_ipc_server(host, port, workers):
+    # One model process owns flan-t5, MiniLM and FAISS; the uvicorn workers are
+    # thin HTTP front ends that forward queries to it over a Unix socket.
+    import multiprocessing
+    import uvicorn
+    from model_server import SOCKET_PATH, ModelClient, serve
+
+    model_proc = multiprocessing.Process(target=serve, args=(SOCKET_PATH,), daemon=True)
+    model_proc.start()
+
+    client = ModelClient(SOCKET_PATH)
+    while True:
+        if not model_proc.is_alive():
+            sys.exit("❌ Model server exited during startup.")
+        try:
+            if client.ping():
+                break
+        except OSError:
+            time.sleep(1)
+
+    os.environ["TRAVELBOT_MODEL_SOCKET"] = SOCKET_PATH
+    try:
+        uvicorn.run("src.web_app:app", host=host, port=port, workers=workers)
+    finally:
+        model_proc.terminate()
+
+def run_preload_server(host, port, workers):
+    # Load the models in the parent, then fork the workers so they share the
+    # weights copy-on-write instead of each loading their own copy.
+    import gc
+    import uvicorn
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src import web_app
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Move everything loaded so far out of the collector's generations so GC
+    # passes in the children don't touch (and un-share) those pages.
+    gc.freeze()
+
+    children = []
+    for worker in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # One worker warms the caches; the others share the results through SQLite.
+            web_app.warmup_on_startup = worker == 0
+            server = uvicorn.Server(uvicorn.Config(web_app.app, host=host, port=port))
+            server.run(sockets=[sock])
+            profiler.write_report()  # os._exit skips atexit handlers
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
 
 def run_ingestion():
     # Import your ingestion logic (ensure a function exists to call)
@@ -26,10 +105,28 @@ def main():
         choices=["server", "ingest", "build-index"],
         help="Command to execute: 'server' to launch the web app, 'ingest' to run ingestion, or 'build-index' to build the vector index."
     )
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind the web server to.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind the web server to.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of HTTP worker processes.")
+    parser.add_argument(
+        "--serve-mode",
+        choices=["single", "ipc", "preload"],
+        default="single",
+        help="'single' runs one reloading worker, 'ipc' shares one model process across workers, "
+             "'preload' loads models once and forks workers that share them copy-on-write."
+    )
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-stage peak RSS and top allocations; workers inherit it via TRAVELBOT_PROFILE.")
     args = parser.parse_args()
+    if args.workers != 1 and args.serve_mode == "single":
+        parser.error("--workers needs --serve-mode ipc or preload; single mode runs one reloading worker.")
+
+    if args.profile:
+        os.environ["TRAVELBOT_PROFILE"] = "1"  # for reloader and model-server subprocesses
+        profiler.enable()
 
     if args.command == "server":
-        run_server()
+        run_server(args.host, args.port, args.workers, args.serve_mode)
     elif args.command == "ingest":
         run_ingestion()
     elif args.command == "build-index":
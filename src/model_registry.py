@@ -0,0 +1,156 @@
+import os
+import gc
+import time
+import logging
+import threading
+from profiling import stage
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+IDLE_TIMEOUT = float(os.environ.get("TRAVELBOT_MODEL_IDLE_TIMEOUT", "0"))  # seconds, 0 = never unload
+
+# Every bot and index builder gets its models from here, so running several
+# entry points in one process (web_app plus a batch evaluation, say) loads
+# flan-t5 and MiniLM once. Models are cached by (model ID, backend, dtype) and
+# reference-counted; with an idle timeout, a model nobody holds is dropped.
+# Loaders import their libraries lazily so retrieval-only callers stay torch-free.
+#
+# Only index builders (build_index, update_knowledge_base, ingest) release what
+# they acquire, so only their models are ever unloaded. Serving paths
+# (travelbot.load_model_and_retriever, simplebot, retrieval's query encoder,
+# text2text_llm) hold their models for the life of the process: the LLM
+# pipeline and vector store keep a reference anyway, so unloading the
+# registry's copy would free nothing and the next acquire would load a second.
+
+# --- Loaders ---
+def _load_seq2seq(model_id, dtype):
+    """Tokenizer and weights for a seq2seq model such as flan-t5."""
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    kwargs = {}
+    if dtype:
+        import torch
+        kwargs["torch_dtype"] = getattr(torch, dtype)
+    with stage("startup.tokenizer"):
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+    with stage("startup.weights"):
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_id, **kwargs)
+    return tokenizer, model
+
+def _load_sentence_transformers(model_id, dtype):
+    """LangChain embeddings backed by sentence-transformers."""
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    model_kwargs = {}
+    if dtype:
+        import torch
+        model_kwargs["model_kwargs"] = {"torch_dtype": getattr(torch, dtype)}
+    return HuggingFaceEmbeddings(model_name=model_id, model_kwargs=model_kwargs)
+
+def _load_fastembed(model_id, dtype):
+    """LangChain embeddings backed by the fastembed ONNX runtime (no torch)."""
+    from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+
+    return FastEmbedEmbeddings(model_name=model_id)
+
+LOADERS = {
+    "seq2seq": _load_seq2seq,
+    "sentence-transformers": _load_sentence_transformers,
+    "fastembed": _load_fastembed,
+}
+
+
+class _Entry:
+    def __init__(self):
+        self.model = None
+        self.refs = 0
+        self.released_at = None
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Process-wide, reference-counted cache of loaded models."""
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, model_id, backend, dtype=None):
+        """Return the model for (model_id, backend, dtype), loading it on first use."""
+        if backend not in LOADERS:
+            raise ValueError(f"Unknown model backend '{backend}'. Choose from: {', '.join(LOADERS)}")
+        key = (model_id, backend, dtype)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refs += 1
+            entry.released_at = None
+
+        # Loading happens outside the registry lock so other models stay available meanwhile.
+        with entry.load_lock:
+            if entry.model is None:
+                try:
+                    logger.info(f"📚 Loading {backend} model: {model_id}")
+                    entry.model = LOADERS[backend](model_id, dtype)
+                except Exception:
+                    self.release(model_id, backend, dtype)
+                    raise
+        return entry.model
+
+    def release(self, model_id, backend, dtype=None):
+        """Drop one reference; an unreferenced model is unloaded after the idle timeout."""
+        key = (model_id, backend, dtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs == 0:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            entry.released_at = time.monotonic()
+
+        if self.idle_timeout > 0:
+            timer = threading.Timer(self.idle_timeout, self._unload_if_idle, args=(key,))
+            timer.daemon = True
+            timer.start()
+
+    def _unload_if_idle(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs > 0 or entry.released_at is None:
+                return
+            if time.monotonic() - entry.released_at < self.idle_timeout:
+                return
+            del self._entries[key]
+        logger.info(f"🧹 Unloaded idle {key[1]} model: {key[0]}")
+        gc.collect()
+
+    def text2text_llm(self, model_id, dtype=None, **pipeline_kwargs):
+        """LangChain LLM over the shared seq2seq weights with its own generation settings.
+
+        The weights stay acquired for as long as the process runs (see above).
+        """
+        from transformers import pipeline
+        from langchain_community.llms import HuggingFacePipeline
+
+        tokenizer, model = self.acquire(model_id, "seq2seq", dtype)
+        with stage("startup.pipeline"):
+            pipe = pipeline("text2text-generation", model=model, tokenizer=tokenizer, **pipeline_kwargs)
+            return HuggingFacePipeline(pipeline=pipe)
+
+    def clear(self):
+        """Forget every model, held or not; callers keep the objects they already have."""
+        with self._lock:
+            self._entries.clear()
+        gc.collect()
+
+    def loaded(self):
+        """Return {(model_id, backend, dtype): refs} for every loaded model."""
+        with self._lock:
+            return {key: entry.refs for key, entry in self._entries.items() if entry.model is not None}
+
+
+registry = ModelRegistry()
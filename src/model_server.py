@@ -0,0 +1,252 @@
+import os
+import json
+import socket
+import logging
+import argparse
+import itertools
+import threading
+import socketserver
+from concurrent.futures import Future, ThreadPoolExecutor
+from deadline import Deadline
+from profiling import profiler
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+SOCKET_PATH = os.environ.get("TRAVELBOT_MODEL_SOCKET", "/tmp/travelbot_model.sock")
+MAX_CONCURRENCY = int(os.environ.get("TRAVELBOT_MODEL_CONCURRENCY", "2"))
+REQUEST_TIMEOUT = 120
+
+# Wire format: one JSON object per line in both directions.
+#   request:  {"id": 7, "op": "ask", "query": "...", "deadline": 30.0}
+#             (ops: ask, answer, answer_batch, chunks, stats, ping)
+#   response: {"id": 7, "answer": "..."}  or  {"id": 7, "error": "..."}
+#   cancel:   {"id": 7, "op": "cancel"}  (no response; stops request 7 early)
+# Responses are written as soon as each request finishes, so several requests
+# from the same HTTP worker can be in flight on one connection at once.
+
+
+# --- Server (owns the models and the index) ---
+class _ModelRequestHandler(socketserver.StreamRequestHandler):
+    """Read requests off one worker connection and answer them out of order."""
+
+    def handle(self):
+        write_lock = threading.Lock()
+        deadlines = {}
+
+        def reply(payload):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                logger.warning("⚠️ Dropping malformed request frame.")
+                continue
+            if request.get("op") == "cancel":
+                deadline = deadlines.pop(request.get("id"), None)
+                if deadline is not None:
+                    deadline.cancel()
+                continue
+            deadline = Deadline(request.get("deadline"))
+            deadlines[request.get("id")] = deadline
+            future = self.server.executor.submit(self.server.dispatch, request, reply, deadline)
+            future.add_done_callback(lambda _, request_id=request.get("id"): deadlines.pop(request_id, None))
+
+        # The worker went away: stop everything it was still waiting on.
+        for deadline in list(deadlines.values()):
+            deadline.cancel()
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server that runs every query against one shared llm/retriever."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, llm, retriever, cache=None, max_concurrency=MAX_CONCURRENCY, warmup=None):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, _ModelRequestHandler)
+        self.llm = llm
+        self.retriever = retriever
+        self.cache = cache
+        self.warmup = warmup
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def dispatch(self, request, reply, deadline=None):
+        """Run a single request and send back its result."""
+        request_id = request.get("id")
+        try:
+            if request.get("op") == "ping":
+                reply({"id": request_id, "answer": "pong"})
+                return
+            if request.get("op") == "stats":
+                from travelbot import answer_path_counts, deadline_counts
+
+                reply({"id": request_id, "answer": {
+                    "paths": dict(answer_path_counts),
+                    "deadlines": dict(deadline_counts),
+                    "cache": self.cache.stats() if self.cache is not None else {},
+                    "warmup": self.warmup.stats() if self.warmup is not None else {},
+                }})
+                return
+            if request.get("op") == "answer":
+                from travelbot import answer_query, serialize_result
+
+                result = answer_query(request["query"], self.llm, self.retriever, self.cache, deadline=deadline)
+                reply({"id": request_id, "answer": serialize_result(request["query"], result, request.get("excerpt_chars"))})
+                return
+            if request.get("op") == "chunks":
+                from retrieval import retrieve_chunks
+                from travelbot import INDEX_NAME, VECTOR_DB_PATH
+
+                # The same store and paragraph lookup /api/ask answers from, already in memory.
+                chunks = retrieve_chunks(request["query"], request.get("k", 3), self.retriever.vectorstore,
+                                         VECTOR_DB_PATH, INDEX_NAME)
+                reply({"id": request_id, "answer": chunks})
+                return
+            if request.get("op") == "answer_batch":
+                from travelbot import answer_batch, serialize_result
+
+                queries = request["query"]
+                results = answer_batch(queries, self.llm, self.retriever, self.cache, deadline=deadline)
+                reply({"id": request_id, "answer": [serialize_result(q, r) for q, r in zip(queries, results)]})
+                return
+            from travelbot import hybrid_response
+
+            answer = hybrid_response(request["query"], self.llm, self.retriever, self.cache, deadline=deadline)
+            reply({"id": request_id, "answer": answer})
+        except Exception as e:
+            logger.error(f"Error answering request {request_id}: {e}")
+            reply({"id": request_id, "error": str(e)})
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def serve(socket_path=SOCKET_PATH, max_concurrency=MAX_CONCURRENCY):
+    """Load the models once and serve queries over a Unix socket until stopped."""
+    from answer_cache import get_default_cache
+    from travelbot import load_model_and_retriever
+    from warmup import start_warmup
+
+    llm, retriever = load_model_and_retriever()
+    cache = get_default_cache()
+    warmup = start_warmup(llm, retriever, cache)
+    server = ModelServer(socket_path, llm, retriever, cache, max_concurrency=max_concurrency, warmup=warmup)
+    logger.info(f"✅ Model server listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        profiler.write_report()
+
+
+# --- Client (used by the HTTP workers) ---
+class ModelClient:
+    """Multiplexed client for the model server.
+
+    A single connection is shared by all requests in the worker; each request is
+    tagged with an id and resolved by a background reader thread.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=REQUEST_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._sock = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        self._sock = sock
+        threading.Thread(target=self._read_responses, args=(sock,), daemon=True).start()
+
+    def _read_responses(self, sock):
+        with sock.makefile("r", encoding="utf-8") as reader:
+            try:
+                for line in reader:
+                    response = json.loads(line)
+                    with self._lock:
+                        future = self._pending.pop(response.get("id"), None)
+                    if future is None:
+                        continue
+                    if "error" in response:
+                        future.set_exception(RuntimeError(response["error"]))
+                    else:
+                        future.set_result(response["answer"])
+            except (OSError, ValueError) as e:
+                logger.error(f"Lost connection to model server: {e}")
+
+        # Fail anything still waiting so callers don't hang on a dead socket.
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError("Model server connection closed."))
+
+    def submit(self, query, op="ask", deadline=None, **options):
+        """Send a query (or list of queries for answer_batch) and return a Future for the answer.
+
+        With a Deadline, its remaining time is sent along and cancelling it
+        cancels the request in the model process.
+        """
+        future = Future()
+        request_id = next(self._ids)
+        payload = {"id": request_id, "op": op, "query": query, **options}
+        if deadline is not None:
+            payload["deadline"] = deadline.remaining()
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            self._pending[request_id] = future
+            try:
+                self._sock.sendall(data)
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                self._sock = None
+                future.set_exception(ConnectionError(f"Model server unavailable: {e}"))
+        if deadline is not None:
+            deadline.on_cancel(lambda: self._send_cancel(request_id))
+        return future
+
+    def _send_cancel(self, request_id):
+        data = (json.dumps({"id": request_id, "op": "cancel"}) + "\n").encode("utf-8")
+        with self._lock:
+            if self._sock is not None and request_id in self._pending:
+                try:
+                    self._sock.sendall(data)
+                except OSError:
+                    pass
+
+    def ask(self, query):
+        """Blocking helper around submit()."""
+        return self.submit(query).result(timeout=self.timeout)
+
+    def ping(self):
+        return self.submit("", op="ping").result(timeout=self.timeout) == "pong"
+
+
+# --- Main ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the shared TravelBot model process.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path to listen on.")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Queries run in parallel.")
+    args = parser.parse_args()
+
+    serve(args.socket, args.concurrency)
@@ -0,0 +1,185 @@
+import os
+import re
+import json
+import pickle
+import logging
+import argparse
+import threading
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+LOOKUP_SUFFIX = ".paragraphs.json"
+ANY_PUBLICATION = "*"
+
+# Questions that cite a paragraph ("JTR 050201", "DAFI 36-3003 para 4.3"),
+# a table ("Table 5-2") or a chapter ("AFMAN 65-114 chapter 7") are answered
+# from an exact-match lookup built next to the FAISS index: identifier ->
+# docstore IDs of the chunks where that paragraph, table or chapter starts.
+# No query embedding or vector search is needed for them. Like retrieval.py,
+# this module stays importable without torch.
+
+# A publication name, in chunk sources ("JTR_chunk12.txt", "dafi36-3003_chunk4.txt") or in questions.
+PUBLICATION = re.compile(
+    r"(?<![A-Za-z])(?P<pub>JTR|DAFI|AFMAN|AFI|DODI|DODM)(?![A-Za-z])[\s_]*(?P<number>\d{1,3}-\d{1,4})?",
+    re.IGNORECASE,
+)
+
+# Headings in chunk text: the identifier starts a line and is followed by its
+# title, which skips table-of-contents lines that list bare numbers.
+HEADINGS = [
+    ("para", re.compile(r"^[ \t]*(\d{6})\.[ \t]+\S", re.MULTILINE)),  # JTR 050201.  Title
+    ("para", re.compile(r"^[ \t]*(\d{1,2}(?:\.\d{1,3}){1,5})\.[ \t]+[A-Z]", re.MULTILINE)),  # DAFI 2.4.4.  Title
+    ("table", re.compile(r"^[ \t]*Table[ \t]+(\d+[A-Z]?(?:[-.]\d+[A-Z]?)+)\.?[ \t]+\S", re.MULTILINE | re.IGNORECASE)),
+    ("chapter", re.compile(r"^[ \t]*chapter[ \t]+(\d+[A-Z]?)\b(?!.*\bchapter\b)", re.MULTILINE | re.IGNORECASE)),
+]
+
+# Kinds a question can cite, most specific first: a cited paragraph or table
+# outranks the chapter around it.
+KIND_RANK = {"para": 0, "table": 0, "chapter": 1}
+
+# Identifiers cited in a question.
+CITATIONS = [
+    ("para", re.compile(r"(?:\bpara(?:graph)?\.?|¶|§)\s*(\d+(?:\.\d+)*)", re.IGNORECASE)),
+    ("para", re.compile(r"\bJTR\s+(\d{6})\b", re.IGNORECASE)),
+    ("para", re.compile(r"(?<![\d.-])((?:0\d|10)\d{4})(?![\d-])")),  # bare JTR paragraph number
+    ("table", re.compile(r"\btable\s+(\d+[A-Z]?(?:[-.]\d+[A-Z]?)+)", re.IGNORECASE)),
+    ("chapter", re.compile(r"\b(?:chapter|chap\.|ch\.)\s*(\d+[A-Z]?)\b", re.IGNORECASE)),
+]
+
+_lookups = {}
+_lookups_lock = threading.Lock()
+
+# --- Identifiers ---
+def publication_name(text):
+    """Canonical publication named in text ("JTR", "DAFI 36-3003"), or None."""
+    match = PUBLICATION.search(text or "")
+    if not match:
+        return None
+    pub = match.group("pub").upper()
+    return f"{pub} {match.group('number')}" if match.group("number") else pub
+
+def identifier_key(publication, kind, number):
+    return f"{publication or ANY_PUBLICATION}|{kind}|{number.rstrip('.').upper()}"
+
+def extract_identifiers(text, source=None):
+    """Return the lookup keys for paragraph, table and chapter headings in a chunk.
+
+    Each heading is keyed under the chunk's publication (from its source file
+    name) and under ANY_PUBLICATION, for questions that don't name one.
+    """
+    publications = (publication_name(source), None)
+    keys = []
+    for kind, pattern in HEADINGS:
+        for number in pattern.findall(text):
+            for publication in publications:
+                key = identifier_key(publication, kind, number)
+                if key not in keys:
+                    keys.append(key)
+    return keys
+
+def query_identifiers(query):
+    """Return the lookup keys for identifiers cited in a question, in the order they appear."""
+    publication = publication_name(query)
+    cited = sorted(
+        (match.start(), identifier_key(publication, kind, match.group(1)))
+        for kind, pattern in CITATIONS
+        for match in pattern.finditer(query)
+    )
+    keys = []
+    for _, key in cited:
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+# --- Build ---
+def build_lookup(docstore, index_to_docstore_id):
+    """Map every heading identifier to the docstore IDs of the chunks it starts, in index order.
+
+    A chapter keeps only its first chunk: "Chapter N" also heads every page
+    of the chapter, and those chunks would crowd out the cited paragraph.
+    """
+    identifiers = {}
+    for position in sorted(index_to_docstore_id):
+        doc_id = index_to_docstore_id[position]
+        doc = docstore.search(doc_id)
+        if isinstance(doc, str):  # InMemoryDocstore returns an error string on a miss
+            continue
+        for key in extract_identifiers(doc.page_content, doc.metadata.get("source")):
+            if key.split("|")[1] == "chapter" and key in identifiers:
+                continue
+            identifiers.setdefault(key, []).append(doc_id)
+    return identifiers
+
+def lookup_path(db_path, index_name):
+    return os.path.join(db_path, f"{index_name}{LOOKUP_SUFFIX}")
+
+def save_lookup(db, db_path, index_name):
+    """Write the identifier lookup for a FAISS store saved to db_path next to its index files."""
+    return write_lookup(db.docstore, db.index_to_docstore_id, db_path, index_name)
+
+def write_lookup(docstore, index_to_docstore_id, db_path, index_name):
+    from answer_cache import index_content_hash
+
+    identifiers = build_lookup(docstore, index_to_docstore_id)
+    path = lookup_path(db_path, index_name)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"index": index_content_hash(db_path, index_name), "identifiers": identifiers}, f)
+    os.replace(f"{path}.tmp", path)
+    logger.info(f"✅ Paragraph lookup with {len(identifiers)} identifiers saved to {path}")
+    return identifiers
+
+def load_lookup(db_path, index_name):
+    """Identifier lookup for an index (reloaded when the file changes); {} if missing or stale."""
+    from answer_cache import index_content_hash
+
+    path = lookup_path(db_path, index_name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    with _lookups_lock:
+        cached = _lookups.get(path)
+        if cached and cached[0] == (stat.st_mtime, stat.st_size):
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        identifiers = data.get("identifiers", {})
+        if data.get("index") != index_content_hash(db_path, index_name):
+            logger.warning(f"⚠️ {path} was built for a different index; rebuild it with paragraph_index.py")
+            identifiers = {}
+        _lookups[path] = ((stat.st_mtime, stat.st_size), identifiers)
+        return identifiers
+
+# --- Lookup ---
+def lookup(query, db_path, index_name, k=None):
+    """Docstore IDs for the identifiers a question cites, or [] when it cites none we know.
+
+    Paragraphs and tables come before chapters; within a kind, citation order.
+    """
+    keys = query_identifiers(query)
+    if not keys:
+        return []
+    identifiers = load_lookup(db_path, index_name)
+    ids = []
+    for key in sorted(keys, key=lambda key: KIND_RANK[key.split("|")[1]]):
+        for doc_id in identifiers.get(key, []):
+            if doc_id not in ids:
+                ids.append(doc_id)
+    return ids[:k] if k else ids
+
+def main():
+    """Build the lookup for an existing index without loading the embedding model."""
+    parser = argparse.ArgumentParser(description="Build the paragraph/table/chapter lookup for a FAISS index.")
+    parser.add_argument("--db", default="vectordb", help="Vector database directory.")
+    parser.add_argument("--index", default="travelbot", help="Index name.")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.db, f"{args.index}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)  # what FAISS.save_local writes
+    write_lookup(docstore, index_to_docstore_id, args.db, args.index)
+
+if __name__ == "__main__":
+    main()
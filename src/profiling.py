@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import resource
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PROFILE_ENABLED = os.environ.get("TRAVELBOT_PROFILE", "").lower() in ("1", "true", "yes")
+REPORT_PATH = os.environ.get("TRAVELBOT_PROFILE_REPORT", "profile_report.json")
+TOP_ALLOCATIONS = int(os.environ.get("TRAVELBOT_PROFILE_TOP", "10"))  # allocation sites kept per stage
+
+# Profiling mode records, for every named stage of the startup and answer
+# paths, the peak RSS and the tracemalloc peak reached inside the stage and the
+# source lines that allocated the most Python memory. On Linux the kernel's
+# peak-RSS counter is reset as each stage starts (/proc/self/clear_refs), so a
+# stage's peak is its own, not the process's peak so far. Stages may nest; a
+# parent's peak includes its children's. Peaks are process-wide, so profile
+# one request at a time. tracemalloc only sees Python allocations: torch
+# tensors and FAISS buffers show up in RSS but not in the allocation lists.
+# When profiling is off, stage() and @profiled cost one attribute check.
+
+# --- Memory Readings ---
+def current_rss_mb():
+    """Resident set size of this process now, in MB."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Peak RSS since the last reset (VmHWM), falling back to ru_maxrss."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter for this process; False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class _Frame:
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.rss_start = current_rss_mb()
+        self.peak_rss = self.rss_start
+        self.traced_peak = 0
+        self.snapshot = None
+
+
+class Profiler:
+    """Collects per-stage memory figures and writes them as a JSON report."""
+
+    def __init__(self, report_path=REPORT_PATH, top=TOP_ALLOCATIONS):
+        self.report_path = report_path
+        self.top = top
+        self.enabled = False
+        self.resettable = False
+        self.peak_rss = 0.0
+        self._pid = None
+        self._stages = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._pid = os.getpid()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.resettable = reset_peak_rss()
+        atexit.register(self.write_report)
+        logger.info(f"🧪 Memory profiling on; report will be written to {self.report_path}")
+
+    def disable(self):
+        self.enabled = False
+        tracemalloc.stop()
+        atexit.unregister(self.write_report)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _observe(self, frame):
+        """Fold the peaks reached since the last reset into frame."""
+        frame.peak_rss = max(frame.peak_rss, peak_rss_mb() if self.resettable else current_rss_mb())
+        frame.traced_peak = max(frame.traced_peak, tracemalloc.get_traced_memory()[1])
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the block as pipeline stage `name` (a no-op unless profiling is on)."""
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        if stack:
+            self._observe(stack[-1])  # the child's resets would otherwise hide the parent's peak so far
+        frame = _Frame(name)
+        frame.snapshot = self._snapshot()
+        if self.resettable:
+            reset_peak_rss()
+        tracemalloc.reset_peak()
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            self._observe(frame)
+            self._record(frame, time.perf_counter() - frame.start, current_rss_mb(), self._snapshot())
+            if stack:
+                parent = stack[-1]
+                parent.peak_rss = max(parent.peak_rss, frame.peak_rss)
+                parent.traced_peak = max(parent.traced_peak, frame.traced_peak)
+
+    def _record(self, frame, seconds, rss_end, snapshot):
+        allocations = [
+            {"line": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size_kb": round(stat.size_diff / 1024, 1), "count": stat.count_diff}
+            for stat in snapshot.compare_to(frame.snapshot, "lineno")[:self.top]
+            if stat.size_diff > 0
+        ]
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, frame.peak_rss)
+            record = self._stages.setdefault(frame.name, {
+                "calls": 0, "seconds": 0.0, "peak_rss_mb": 0.0, "rss_delta_mb": 0.0,
+                "traced_peak_mb": 0.0, "top_allocations": [],
+            })
+            record["calls"] += 1
+            record["seconds"] += seconds
+            record["rss_delta_mb"] = max(record["rss_delta_mb"], rss_end - frame.rss_start)
+            record["peak_rss_mb"] = max(record["peak_rss_mb"], frame.peak_rss)
+            traced_peak_mb = frame.traced_peak / (1024 * 1024)
+            if traced_peak_mb >= record["traced_peak_mb"]:  # keep the allocation sites of the worst call
+                record["traced_peak_mb"] = traced_peak_mb
+                record["top_allocations"] = allocations
+
+    def report(self):
+        """Return the report as a JSON-friendly dict."""
+        with self._lock:
+            stages = {
+                name: {**record, **{key: round(record[key], 3) for key in
+                                    ("seconds", "peak_rss_mb", "rss_delta_mb", "traced_peak_mb")}}
+                for name, record in self._stages.items()
+            }
+            return {
+                "pid": os.getpid(),
+                "python": sys.version.split()[0],
+                "per_stage_peak_rss": self.resettable,
+                "peak_rss_mb": round(max(self.peak_rss, current_rss_mb()), 3),
+                "stages": stages,
+            }
+
+    def write_report(self, path=None):
+        """Write the JSON report; forked workers write <name>.<pid>.json instead of sharing a file."""
+        if not self.enabled:
+            return None
+        path = path or self.report_path
+        if os.getpid() != self._pid:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{os.getpid()}{ext}"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"🧪 Memory profile written to {path}")
+        return path
+
+
+profiler = Profiler()
+stage = profiler.stage
+
+def profiled(name):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+if PROFILE_ENABLED:
+    profiler.enable()
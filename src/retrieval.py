@@ -0,0 +1,150 @@
+import os
+import logging
+import threading
+import importlib.util
+from profiling import profiled
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+VECTOR_DB_PATH = "vectordb"
+INDEX_NAME = "travelbot"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ENCODER = os.environ.get("TRAVELBOT_ENCODER", "auto")  # auto | fastembed | sentence-transformers
+
+# This module is the retrieval-only path: it must stay importable without
+# torch/transformers, so every heavy import happens inside a function.
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def create_query_embeddings(model_name=EMBEDDING_MODEL, encoder=ENCODER):
+    """Get the query encoder, preferring the ONNX fastembed backend when available."""
+    from model_registry import registry
+
+    if encoder == "auto":
+        encoder = "fastembed" if importlib.util.find_spec("fastembed") else "sentence-transformers"
+    logger.info(f"🔧 Using {encoder} encoder for {model_name}.")
+    return registry.acquire(model_name, encoder)
+
+def load_vectorstore(db_path=VECTOR_DB_PATH, index_name=INDEX_NAME, model_name=EMBEDDING_MODEL, encoder=ENCODER):
+    """Load (once per process) the FAISS store with only the embedding model attached."""
+    key = (db_path, index_name, model_name, encoder)
+    with _stores_lock:
+        if key not in _stores:
+            from langchain_community.vectorstores import FAISS
+
+            logger.info(f"🔍 Loading vector database from: {db_path}")
+            store = FAISS.load_local(
+                db_path,
+                create_query_embeddings(model_name, encoder),
+                index_name=index_name,
+                allow_dangerous_deserialization=True
+            )
+            store.index_location = (db_path, index_name)  # where retrieve_chunks finds its paragraph lookup
+            _stores[key] = store
+        return _stores[key]
+
+@profiled("chunks.retrieval")
+def retrieve_chunks(query, k=3, vectorstore=None, db_path=None, index_name=None):
+    """Return the top k chunks for query as plain dicts (id, source, score, text).
+
+    A query citing a paragraph, table or chapter is answered from the
+    paragraph lookup saved next to the index without embedding it. With no
+    vectorstore the default index is loaded; a store that load_vectorstore
+    did not load needs the db_path and index_name it was saved under.
+    """
+    from paragraph_index import lookup
+
+    if vectorstore is None:
+        vectorstore = load_vectorstore(db_path or VECTOR_DB_PATH, index_name or INDEX_NAME)
+    if db_path is None or index_name is None:
+        location = getattr(vectorstore, "index_location", None)
+        if location is None:
+            raise ValueError("retrieve_chunks needs db_path and index_name for this vectorstore.")
+        db_path, index_name = db_path or location[0], index_name or location[1]
+
+    hits = [(doc_id, 0.0) for doc_id in lookup(query, db_path, index_name, k)]
+    if not hits:
+        hits = search_with_ids(vectorstore, query, k)
+    return [chunk_to_dict(*hit) for hit in fetch_scored_documents(vectorstore, hits)]
+
+def retrieve_batch(queries, k=3, vectorstore=None):
+    """Retrieve for many queries at once; returns one list of Documents per query."""
+    vectorstore = vectorstore if vectorstore is not None else load_vectorstore()
+    return [
+        [doc for _, doc, _ in fetch_scored_documents(vectorstore, hits)]
+        for hits in search_batch_with_ids(vectorstore, queries, k)
+    ]
+
+def chunk_to_dict(doc_id, doc, similarity, excerpt_chars=None):
+    """JSON-friendly view of one retrieved chunk.
+
+    With excerpt_chars the full text is replaced by an "excerpt" cut at the
+    last word boundary before that many characters.
+    """
+    chunk = {"id": doc_id, "source": doc.metadata.get("source"), "score": round(similarity, 4)}
+    text = doc.page_content.strip()
+    if excerpt_chars is None:
+        chunk["text"] = text
+    elif len(text) <= excerpt_chars:
+        chunk["excerpt"] = text
+    else:
+        chunk["excerpt"] = text[:excerpt_chars].rsplit(" ", 1)[0] + "…"
+    return chunk
+
+# Helpers that talk to a LangChain FAISS store directly so callers get the
+# docstore IDs and distances back (get_relevant_documents only returns text).
+
+def _search_vectors(vectorstore, vectors, k):
+    """Run one FAISS search over a (n_queries, dim) matrix of query vectors."""
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if getattr(vectorstore, "_normalize_L2", False):
+        import faiss
+        faiss.normalize_L2(vectors)
+
+    distances, indices = vectorstore.index.search(vectors, k)
+    return [
+        [(vectorstore.index_to_docstore_id[int(i)], float(d)) for d, i in zip(row_d, row_i) if i != -1]
+        for row_d, row_i in zip(distances, indices)
+    ]
+
+def search_with_ids(vectorstore, query, k=3):
+    """Return [(docstore_id, distance), ...] for the k chunks nearest to query."""
+    return _search_vectors(vectorstore, [vectorstore.embeddings.embed_query(query)], k)[0]
+
+def search_batch_with_ids(vectorstore, queries, k=3):
+    """Batched search_with_ids: one encoder call for all queries, one FAISS matrix search."""
+    if not queries:
+        return []
+    return _search_vectors(vectorstore, vectorstore.embeddings.embed_documents(list(queries)), k)
+
+def fetch_documents(vectorstore, ids):
+    """Look up chunk Documents by docstore ID, skipping IDs that no longer exist."""
+    docs = []
+    for doc_id in ids:
+        doc = vectorstore.docstore.search(doc_id)
+        if isinstance(doc, str):  # InMemoryDocstore returns an error string on a miss
+            logger.warning(f"⚠️ Chunk {doc_id} not found in docstore.")
+            continue
+        docs.append(doc)
+    return docs
+
+def distance_to_similarity(distance):
+    """Convert a squared L2 distance between unit vectors into cosine similarity.
+
+    MiniLM embeddings are normalized, so ||a - b||^2 = 2 - 2cos(a, b).
+    """
+    return max(0.0, min(1.0, 1.0 - distance / 2.0))
+
+def fetch_scored_documents(vectorstore, hits):
+    """Turn [(docstore_id, distance), ...] into [(docstore_id, Document, similarity), ...]."""
+    scored = []
+    for doc_id, distance in hits:
+        for doc in fetch_documents(vectorstore, [doc_id]):
+            scored.append((doc_id, doc, distance_to_similarity(distance)))
+    return scored
@@ -0,0 +1,44 @@
+import re
+
+# One PII/OPSEC check for every way a question comes in (CLI bots, /api/ask,
+# /api/chunks, the warmup question log). Kept free of model imports so the
+# retrieval-only path can use it.
+
+SENSITIVE_INPUT_WARNING = "⚠️ Input may contain sensitive information. Please rephrase your question."
+
+# --- PII/OPSEC Detection ---
+def detect_pii_or_opsec(text, check_names=True):
+    """Detect sensitive information in the input text.
+
+    check_names also flags two capitalized words in a row as a possible
+    name. Chunk search leaves it off: its questions often cite publication
+    titles ("Joint Travel Regulations") and it never generates text.
+    """
+    safe_context_words = ["location", "airport", "TDY", "PCS", "JTR"]
+    if any(word.lower() in text.lower() for word in safe_context_words):
+        return False
+
+    patterns = [
+        r"\b\d{3}-\d{2}-\d{4}\b",  # SSN
+        r"\b\d{10}\b",  # 10-digit phone number
+        r"\(\d{3}\)\s*\d{3}-\d{4}",  # (123) 456-7890
+        r"\b\d{2}[-/]\d{2}[-/]\d{4}\b",  # DOB
+        r"\b[A-Z]{2,6}\d{4,7}\b",  # DoD ID or tail number
+        r"\b(classified|secret|OPSEC|grid ref|coordinates)\b"  # OPSEC terms
+    ]
+
+    for pattern in patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+
+    if not check_names:
+        return False
+
+    capitalized_words = re.findall(r"\b[A-Z][a-z]+\b", text)
+    if len(capitalized_words) >= 2:
+        for i in range(len(capitalized_words) - 1):
+            pattern = f"{capitalized_words[i]} {capitalized_words[i+1]}"
+            if re.search(rf"\b{re.escape(pattern)}\b", text):
+                return True
+
+    return False
@@ -5,11 +5,9 @@ from typing import Optional
 import torch
 
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from langchain.chains import RetrievalQA
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-from langchain_huggingface.llms import HuggingFacePipeline
 from transformers import PreTrainedTokenizerBase
+from model_registry import registry
 
 # --- Configuration ---
 MODEL_ID = "google/flan-t5-base"
@@ -46,12 +44,8 @@ def sanitize_input(text: str) -> str:
 # --- Model Setup ---
 def setup_model(model_id: str):
     logger.info(f"Loading model: {model_id}...")
-    tokenizer = AutoTokenizer.from_pretrained(model_id)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_id, device_map="auto")
-    pipe = pipeline(
-        "text2text-generation",
-        model=model,
-        tokenizer=tokenizer,
+    llm = registry.text2text_llm(
+        model_id,
         max_new_tokens=128,
         do_sample=True,
         temperature=0.7,
@@ -59,13 +53,12 @@ def setup_model(model_id: str):
         top_k=50,
         top_p=0.95
     )
-    llm = HuggingFacePipeline(pipeline=pipe)
-    return tokenizer, llm
+    return llm.pipeline.tokenizer, llm
 
 # --- Vector DB Setup ---
 def setup_vector_db(db_path: str):
     logger.info(f"Loading vector database from: {db_path}...")
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    embeddings = registry.acquire("sentence-transformers/all-MiniLM-L6-v2", "sentence-transformers")
     db = FAISS.load_local(db_path, embeddings, allow_dangerous_deserialization=True)
     return db.as_retriever(search_type="similarity", search_kwargs={"k": 3})
 
@@ -1,12 +1,16 @@
 import os
-import re
 import argparse
 import logging
 from langchain.chains import RetrievalQA
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-from langchain_community.llms import HuggingFacePipeline
+from answer_cache import get_default_cache, index_content_hash
+from collections import Counter
+from deadline import DeadlineStoppingCriteria
+from model_registry import registry
+from paragraph_index import lookup as lookup_identifiers
+from profiling import profiled, profiler, stage
+from retrieval import chunk_to_dict, fetch_scored_documents, search_batch_with_ids, search_with_ids
+from safety import SENSITIVE_INPUT_WARNING, detect_pii_or_opsec
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -18,102 +22,44 @@ USE_RETRAINED_INDEX = True
 VECTOR_DB_PATH = "vectordb_retrain" if USE_RETRAINED_INDEX else "vectordb"
 INDEX_NAME = "travelbot_retrain" if USE_RETRAINED_INDEX else "travelbot"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+GENERATION_PARAMS = {"max_new_tokens": 100}
+
+# Adaptive mode: the best retrieval similarity (0-1) decides how much to generate.
+ADAPTIVE_MODE = os.environ.get("TRAVELBOT_ADAPTIVE", "").lower() in ("1", "true", "yes")
+HIGH_CONFIDENCE = float(os.environ.get("TRAVELBOT_HIGH_CONFIDENCE", "0.75"))
+LOW_CONFIDENCE = float(os.environ.get("TRAVELBOT_LOW_CONFIDENCE", "0.35"))
+HIGH_CONFIDENCE_MAX_NEW_TOKENS = int(os.environ.get("TRAVELBOT_HIGH_CONFIDENCE_TOKENS", "0"))  # 0 = no preface
+MEDIUM_CONFIDENCE_MAX_NEW_TOKENS = int(os.environ.get("TRAVELBOT_MEDIUM_CONFIDENCE_TOKENS", "40"))
+
+REQUEST_CANCELLED_MESSAGE = "Request cancelled."
+FALLBACK_MESSAGE = (
+    "I couldn’t find a specific regulation that clearly answers this. "
+    "You may want to consult your FSO or check JTR guidance for your PDS."
+)
 SOURCE_VERSION_MAP = {
     "jtr_mar2025_chunk0.txt": "JTR (March 2025)",
     "afman65-114_chunk0.txt": "AFMAN 65-114",
     "dafi36-3003_chunk0.txt": "DAFI 36-3003"
 }
 
-SAMPLE_QUESTIONS_FILE = "sample_questions.txt"  # Define the file path
-
-def log_user_question(question, mode):
-    """Log user questions to the sample_questions.txt file."""
-    try:
-        if os.path.exists(SAMPLE_QUESTIONS_FILE):
-            with open(SAMPLE_QUESTIONS_FILE, "r", encoding="utf-8") as f:
-                if question.strip() in f.read():
-                    return
-
-        with open(SAMPLE_QUESTIONS_FILE, "a", encoding="utf-8") as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"Q: {question.strip()} (Asked on {timestamp}, Mode: {mode})\n")
-        logger.info(f"✅ Logged question: {question}")
-    except Exception as e:
-        logger.error(f"❌ Failed to log question: {e}")
-
-def detect_pii_or_opsec(text):
-    """Detect sensitive information in the input text."""
-    safe_context_words = ["location", "airport", "TDY", "PCS", "JTR"]
-    if any(word.lower() in text.lower() for word in safe_context_words):
-        return False
-
-def detect_pii_or_opsec(text):
-    """Detect sensitive information in the input text."""
-    safe_context_words = ["location", "airport", "TDY", "PCS", "JTR"]
-    if any(word.lower() in text.lower() for word in safe_context_words):
-        return False
-
-    patterns = [
-        r"\b\d{3}-\d{2}-\d{4}\b",  # SSN
-        r"\b\d{10}\b",  # 10-digit phone number
-        r"\(\d{3}\)\s*\d{3}-\d{4}",  # (123) 456-7890
-        r"\b\d{2}[-/]\d{2}[-/]\d{4}\b",  # DOB
-        r"\b[A-Z]{2,6}\d{4,7}\b",  # DoD ID or tail number
-        r"\b(classified|secret|OPSEC|grid ref|coordinates)\b"  # OPSEC terms
-    ]
-
-    for pattern in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
-
-    return False
-
-# --- PII/OPSEC Detection ---
-def detect_pii_or_opsec(text):
-    """Detect sensitive information in the input text."""
-    safe_context_words = ["location", "airport", "TDY", "PCS", "JTR"]
-    if any(word.lower() in text.lower() for word in safe_context_words):
-        return False
-
-    patterns = [
-        r"\b\d{3}-\d{2}-\d{4}\b",  # SSN
-        r"\b\d{10}\b",  # 10-digit phone number
-        r"\(\d{3}\)\s*\d{3}-\d{4}",  # (123) 456-7890
-        r"\b\d{2}[-/]\d{2}[-/]\d{4}\b",  # DOB
-        r"\b[A-Z]{2,6}\d{4,7}\b",  # DoD ID or tail number
-        r"\b(classified|secret|OPSEC|grid ref|coordinates)\b"  # OPSEC terms
-    ]
-
-    for pattern in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
-
-    capitalized_words = re.findall(r"\b[A-Z][a-z]+\b", text)
-    if len(capitalized_words) >= 2:
-        for i in range(len(capitalized_words) - 1):
-            pattern = f"{capitalized_words[i]} {capitalized_words[i+1]}"
-            if re.search(rf"\b{re.escape(pattern)}\b", text):
-                return True
-
-    return False
-
 # --- Model and Retriever Setup ---
 def load_model_and_retriever():
     """Load the language model and FAISS retriever."""
     try:
         logger.info("📚 Loading language model...")
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
-        model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID)
-        pipe = pipeline("text2text-generation", model=model, tokenizer=tokenizer, max_new_tokens=100)
-        llm = HuggingFacePipeline(pipeline=pipe)
+        with stage("startup.llm"):
+            llm = registry.text2text_llm(MODEL_ID, **GENERATION_PARAMS)
 
         logger.info("🔍 Loading FAISS vector database...")
-        db = FAISS.load_local(
-            VECTOR_DB_PATH,
-            HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
-            index_name=INDEX_NAME,
-            allow_dangerous_deserialization=True
-        )
+        with stage("startup.embeddings"):
+            embeddings = registry.acquire(EMBEDDING_MODEL, "sentence-transformers")
+        with stage("startup.docstore"):
+            db = FAISS.load_local(
+                VECTOR_DB_PATH,
+                embeddings,
+                index_name=INDEX_NAME,
+                allow_dangerous_deserialization=True
+            )
         retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 3})
         return llm, retriever
     except Exception as e:
@@ -121,20 +67,28 @@ def load_model_and_retriever():
         raise
 
 # --- Response Generation ---
-def format_sources(retrieved):
-    """Format the sources for display."""
+answer_path_counts = Counter()  # how often each pipeline path was taken
+deadline_counts = Counter()  # on_time / truncated / cancelled, for requests with a deadline
+
+def source_labels(retrieved):
+    """Return the sorted, de-duplicated regulation labels for retrieved chunks."""
     labels = set()
     for doc in retrieved:
         fname = doc.metadata["source"]
         label = SOURCE_VERSION_MAP.get(fname, fname.split("_chunk")[0])
         labels.add(label)
-    return "\n".join(f"- {label}" for label in sorted(labels))
+    return sorted(labels)
 
-def hybrid_response(query, llm, retriever):
-    """Generate a response to the user's query."""
-    if detect_pii_or_opsec(query):
-        return "\u26a0\ufe0f Input may contain sensitive information. Please rephrase your question."
+def format_sources(retrieved):
+    """Format the sources for display."""
+    return "\n".join(f"- {label}" for label in source_labels(retrieved))
 
+def generate_preface(query, llm, cache=None, max_new_tokens=None, deadline=None):
+    """Generate the conversational preface, reusing a cached one when available.
+
+    Returns (preface, truncated). With a deadline, generation stops at the
+    first token after it expires and the partial text is returned uncached.
+    """
     context_hint = (
         "Answer clearly and concisely using Air Force travel regulations when relevant. "
         "Use a helpful tone. Only include citations if needed."
@@ -143,18 +97,200 @@ def hybrid_response(query, llm, retriever):
         f"The user asked: '{query}'. Please explain in a helpful and detailed way using regulation terms if possible."
     )
     full_prompt = context_hint + "\n\n" + pre_prompt
-    preface = str(llm(full_prompt)).strip()
 
-    retrieved = retriever.get_relevant_documents(query)
-    raw_chunks = "\n\n".join(doc.page_content for doc in retrieved)
+    params = dict(GENERATION_PARAMS)
+    if max_new_tokens is not None:
+        params["max_new_tokens"] = max_new_tokens
+
+    def generate():
+        if deadline is None and params == GENERATION_PARAMS:
+            return str(llm(full_prompt)).strip(), False
+        # Per-call overrides go straight to the transformers pipeline.
+        kwargs = dict(params)
+        stopper = None
+        if deadline is not None:
+            if deadline.expired():
+                return "", True
+            stopper = DeadlineStoppingCriteria(deadline)
+            kwargs["stopping_criteria"] = [stopper]  # merged into generate()'s StoppingCriteriaList
+        preface = llm.pipeline(full_prompt, **kwargs)[0]["generated_text"].strip()
+        return preface, stopper is not None and stopper.triggered
+
+    if cache is None:
+        with stage("answer.generation"):
+            return generate()
+
+    key = cache.make_key("preface", query, model_id=MODEL_ID, params=params)
+    preface = cache.get("preface", key)
+    if preface is not None:
+        return preface, False
+    with stage("answer.generation"):
+        preface, truncated = generate()
+    if not truncated:
+        cache.set("preface", key, preface)
+    return preface, truncated
+
+def _retrieval_key(cache, query, k):
+    return cache.make_key(
+        "retrieval", query,
+        embedding_model=EMBEDDING_MODEL, k=k, index=index_content_hash(VECTOR_DB_PATH, INDEX_NAME)
+    )
+
+@profiled("answer.retrieval")
+def retrieve_scored(query, retriever, cache=None):
+    """Retrieve the top chunks for a query as (chunk ID, Document, similarity), best first."""
+    vectorstore = retriever.vectorstore
+    k = retriever.search_kwargs.get("k", 4)
+
+    # Cited paragraphs, tables and chapters come straight from the lookup, with no embedding or search.
+    direct = lookup_identifiers(query, VECTOR_DB_PATH, INDEX_NAME, k)
+    if direct:
+        return fetch_scored_documents(vectorstore, [(doc_id, 0.0) for doc_id in direct])
+
+    if cache is None:
+        hits = search_with_ids(vectorstore, query, k)
+    else:
+        key = _retrieval_key(cache, query, k)
+        hits = cache.get("retrieval", key)
+        if hits is None:
+            hits = search_with_ids(vectorstore, query, k)
+            cache.set("retrieval", key, hits)
+
+    return fetch_scored_documents(vectorstore, hits)
+
+@profiled("answer.retrieval_batch")
+def retrieve_scored_batch(queries, retriever, cache=None):
+    """Batched retrieve_scored: cache misses are embedded and searched together."""
+    vectorstore = retriever.vectorstore
+    k = retriever.search_kwargs.get("k", 4)
+
+    # Direct lookups first, so cited headings never count as cache misses.
+    hits = [[(doc_id, 0.0) for doc_id in lookup_identifiers(query, VECTOR_DB_PATH, INDEX_NAME, k)] or None
+            for query in queries]
+    keys = [None] * len(queries)
+    if cache is not None:
+        for i, query in enumerate(queries):
+            if hits[i] is None:
+                keys[i] = _retrieval_key(cache, query, k)
+                hits[i] = cache.get("retrieval", keys[i])
+
+    missing = [i for i, hit in enumerate(hits) if hit is None]
+    if missing:
+        searched = search_batch_with_ids(vectorstore, [queries[i] for i in missing], k)
+        for i, hit in zip(missing, searched):
+            hits[i] = hit
+            if cache is not None:
+                cache.set("retrieval", keys[i], hit)
+
+    return [fetch_scored_documents(vectorstore, hit) for hit in hits]
+
+def answer_query(query, llm, retriever, cache=None, adaptive=ADAPTIVE_MODE, scored=None, deadline=None, record=True):
+    """Run the answer pipeline and return its parts.
+
+    In adaptive mode the top retrieval similarity picks how much generation to
+    do: a short (or no) preface on a confident match, a shortened preface on a
+    medium one, and no generation at all when nothing relevant was found.
+    Pass scored (from retrieve_scored_batch) to skip the retrieval step, and a
+    Deadline to cap generation time; a cancelled deadline skips remaining work.
+    record=False keeps the call out of answer_path_counts and deadline_counts
+    (cache warmup is not user traffic).
+    """
+    empty = {"chunk_ids": [], "documents": [], "scores": [], "truncated": False, "cancelled": False}
+    if detect_pii_or_opsec(query):
+        if record:
+            answer_path_counts["blocked"] += 1
+        return {**empty, "path": "blocked", "preface": SENSITIVE_INPUT_WARNING}
+    if deadline is not None and deadline.cancelled:
+        if record:
+            deadline_counts["cancelled"] += 1
+        return {**empty, "path": "cancelled", "preface": "", "cancelled": True}
+
+    truncated = False
+    if not adaptive:
+        path = "full"
+        preface, truncated = generate_preface(query, llm, cache, deadline=deadline)
+        if scored is None:
+            scored = retrieve_scored(query, retriever, cache)
+    else:
+        if scored is None:
+            scored = retrieve_scored(query, retriever, cache)
+        confidence = scored[0][2] if scored else 0.0
+        if confidence >= HIGH_CONFIDENCE:
+            path = "high"
+            preface, truncated = (
+                generate_preface(query, llm, cache, HIGH_CONFIDENCE_MAX_NEW_TOKENS, deadline)
+                if HIGH_CONFIDENCE_MAX_NEW_TOKENS > 0 else ("", False)
+            )
+        elif confidence >= LOW_CONFIDENCE:
+            path = "medium"
+            preface, truncated = generate_preface(query, llm, cache, MEDIUM_CONFIDENCE_MAX_NEW_TOKENS, deadline)
+        else:
+            path = "low"
+            preface = ""
+
+    cancelled = deadline is not None and deadline.cancelled
+    if record:
+        answer_path_counts[path] += 1
+    if record and deadline is not None:
+        deadline_counts["cancelled" if cancelled else "truncated" if truncated else "on_time"] += 1
+    return {
+        "path": path,
+        "preface": preface,
+        "truncated": truncated,
+        "cancelled": cancelled,
+        "chunk_ids": [doc_id for doc_id, _, _ in scored],
+        "documents": [doc for _, doc, _ in scored],
+        "scores": [score for _, _, score in scored],
+    }
+
+def answer_batch(queries, llm, retriever, cache=None, adaptive=ADAPTIVE_MODE, deadline=None):
+    """Answer several queries, retrieving for all of them in one batched search.
+
+    One Deadline covers the whole batch: once it passes, the remaining
+    queries get excerpts without a preface, and cancelling it skips them.
+    """
+    allowed = [query for query in queries if not detect_pii_or_opsec(query)]
+    if deadline is not None and deadline.cancelled:
+        allowed = []
+    scored = dict(zip(allowed, retrieve_scored_batch(allowed, retriever, cache)))
+    return [answer_query(query, llm, retriever, cache, adaptive, scored.get(query), deadline) for query in queries]
+
+@profiled("answer.serialize")
+def serialize_result(query, result, excerpt_chars=None):
+    """JSON-friendly view of an answer_query result (chunk excerpts when excerpt_chars is set)."""
+    return {
+        "query": query,
+        "path": result["path"],
+        "preface": result["preface"],
+        "truncated": result["truncated"],
+        "chunks": [
+            chunk_to_dict(doc_id, doc, score, excerpt_chars)
+            for doc_id, doc, score in zip(result["chunk_ids"], result["documents"], result["scores"])
+        ],
+        "sources": source_labels(result["documents"]),
+    }
+
+def hybrid_response(query, llm, retriever, cache=None, adaptive=ADAPTIVE_MODE, scored=None, deadline=None):
+    """Generate a response to the user's query."""
+    result = answer_query(query, llm, retriever, cache, adaptive, scored, deadline)
+    if result["path"] == "blocked":
+        return result["preface"]
+    if result["cancelled"]:
+        return REQUEST_CANCELLED_MESSAGE
+
+    with stage("answer.format"):
+        preface = result["preface"]
+        retrieved = result["documents"]
+        raw_chunks = "\n\n".join(doc.page_content for doc in retrieved)
+        lead = f"{preface}\n\n" if preface else ""
 
-    if not retrieved or len(raw_chunks) < 200:
-        return f"{preface}\n\nI couldn’t find a specific regulation that clearly answers this. You may want to consult your FSO or check JTR guidance for your PDS.\n\n---\nSources:\n{format_sources(retrieved)}"
+        if result["path"] == "low" or not retrieved or len(raw_chunks) < 200:
+            return f"{lead}{FALLBACK_MESSAGE}\n\n---\nSources:\n{format_sources(retrieved)}"
 
-    return f"{preface}\n\n---\n{raw_chunks}\n\n---\nSources:\n{format_sources(retrieved)}"
+        return f"{lead}---\n{raw_chunks}\n\n---\nSources:\n{format_sources(retrieved)}"
 
 # --- CLI ---
-def run_cli(llm, retriever):
+def run_cli(llm, retriever, cache=None, adaptive=ADAPTIVE_MODE):
     """Run the CLI for user interaction."""
     print("\u2708\ufe0f AF TravelBot is ready. Ask your JTR/DAFI questions.")
     print("[SECURITY NOTICE] Do not enter names, SSNs, DOBs, addresses, or OPSEC info.")
@@ -162,13 +298,19 @@ def run_cli(llm, retriever):
         query = input("\n> ")
         if query.lower() in ["exit", "quit"]:
             break
-        result = hybrid_response(query, llm, retriever)
+        result = hybrid_response(query, llm, retriever, cache, adaptive)
         print("\nAnswer:\n", result)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AF TravelBot CLI")
     parser.add_argument("--mode", choices=["friendly", "raw"], default="friendly", help="Choose response style.")
+    parser.add_argument("--adaptive", action="store_true", default=ADAPTIVE_MODE,
+                        help="Scale preface generation by retrieval confidence.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-stage peak RSS and top allocations (see profiling.py).")
     args = parser.parse_args()
+    if args.profile:
+        profiler.enable()
 
     llm, retriever = load_model_and_retriever()
-    run_cli(llm, retriever)
\ No newline at end of file
+    run_cli(llm, retriever, get_default_cache(), args.adaptive)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+import re
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from answer_cache import normalize_query
+from deadline import Deadline
+from safety import detect_pii_or_opsec
+
+# --- Logging Setup ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+QUESTION_LOG = os.environ.get("TRAVELBOT_QUESTION_LOG", os.path.join("context", "sample_questions.txt"))
+WARMUP_QUESTIONS = int(os.environ.get("TRAVELBOT_WARMUP_QUESTIONS", "20"))  # 0 = no warmup
+WARMUP_BUDGET = float(os.environ.get("TRAVELBOT_WARMUP_BUDGET", "5"))  # seconds startup may wait
+RECENCY_HALF_LIFE_DAYS = float(os.environ.get("TRAVELBOT_WARMUP_HALF_LIFE_DAYS", "14"))
+
+# After a restart the answer caches are cold, so the first people to ask the
+# most common questions pay for retrieval and generation. Warmup replays the
+# top questions from the question log through the answer pipeline on a
+# background thread; startup waits for it at most WARMUP_BUDGET seconds and
+# the rest finishes while the app is already serving.
+
+LOG_LINE = re.compile(r"^Q:\s*(?P<question>.+?)(?:\s+\(Asked on (?P<asked>[\d\- :]+), Mode: (?P<mode>\w+)\))?\s*$")
+EXIT_COMMANDS = ("exit", "quit")
+
+def log_user_question(question, mode, path=QUESTION_LOG):
+    """Append a question to the question log; callers drop exit commands and sensitive input first."""
+    try:
+        # Repeats are kept: rank_questions counts how often each one is asked.
+        with open(path, "a", encoding="utf-8") as f:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"Q: {question.strip()} (Asked on {timestamp}, Mode: {mode})\n")
+        logger.info(f"✅ Logged question: {question}")
+    except Exception as e:
+        logger.error(f"❌ Failed to log question: {e}")
+
+def parse_question_log(path=QUESTION_LOG):
+    """Return (question, asked_at or None, mode or None) for every Q: line in the log.
+
+    Exit commands and questions the PII/OPSEC check rejects are skipped, so
+    older logs that recorded them are never replayed.
+    """
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            match = LOG_LINE.match(line.strip())
+            if not match:
+                continue
+            question = match.group("question")
+            if question.strip().lower() in EXIT_COMMANDS or detect_pii_or_opsec(question):
+                continue
+            asked_at = None
+            if match.group("asked"):
+                try:
+                    asked_at = datetime.strptime(match.group("asked"), "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    pass
+            entries.append((question, asked_at, match.group("mode")))
+    return entries
+
+def rank_questions(entries, limit=WARMUP_QUESTIONS, now=None, half_life_days=RECENCY_HALF_LIFE_DAYS):
+    """Rank logged questions by frequency, with each ask weighted by how recent it is.
+
+    An ask counts 1.0 today and half that every half_life_days; undated lines
+    (hand-written samples) count as if asked one half-life ago.
+    """
+    now = now or datetime.now()
+    scores = defaultdict(float)
+    latest = {}
+    for question, asked_at, _ in entries:
+        key = normalize_query(question)
+        age_days = (now - asked_at).total_seconds() / 86400 if asked_at else half_life_days
+        scores[key] += 0.5 ** (max(0.0, age_days) / half_life_days)
+        latest[key] = question  # ask with the most recent wording
+    ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [latest[key] for key in ranked[:limit]]
+
+
+class Warmup:
+    """Runs questions through answer_fn(query, deadline) on a background thread."""
+
+    def __init__(self, answer_fn, questions):
+        self.answer_fn = answer_fn
+        self.questions = list(questions)
+        self.warmed = 0
+        self.failed = 0
+        self.seconds = 0.0
+        self._stopped = threading.Event()
+        self._deadline = Deadline()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+
+    def _run(self):
+        start_time = time.monotonic()
+        for question in self.questions:
+            if self._stopped.is_set():
+                break
+            self._deadline = Deadline()
+            try:
+                self.answer_fn(question, self._deadline)
+                self.warmed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"⚠️ Warmup failed for '{question}': {e}")
+            self.seconds = time.monotonic() - start_time
+        logger.info(f"🔥 Warmup finished: {self.warmed}/{len(self.questions)} questions in {self.seconds:.1f}s")
+
+    def start(self, budget=WARMUP_BUDGET):
+        """Start warming and block for at most budget seconds."""
+        logger.info(f"🔥 Warming caches with {len(self.questions)} logged questions (waiting up to {budget}s)...")
+        self._thread.start()
+        self._thread.join(budget)
+        if self._thread.is_alive():
+            logger.info(f"🔥 Warmup continuing in the background ({self.warmed} done)")
+        return self
+
+    def stop(self):
+        """Stop after cancelling the question in flight, and wait for the thread."""
+        self._stopped.set()
+        self._deadline.cancel()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def done(self):
+        return self._thread.ident is not None and not self._thread.is_alive()
+
+    def stats(self):
+        return {"questions": len(self.questions), "warmed": self.warmed, "failed": self.failed,
+                "seconds": round(self.seconds, 2), "done": self.done()}
+
+
+def start_warmup(llm, retriever, cache, path=QUESTION_LOG, limit=WARMUP_QUESTIONS, budget=WARMUP_BUDGET):
+    """Warm the retrieval and preface caches with the top logged questions; None when there is nothing to do."""
+    if limit <= 0 or cache is None:
+        return None
+    questions = rank_questions(parse_question_log(path), limit)
+    if not questions:
+        return None
+    from travelbot import answer_query
+
+    # The deadline only lets stop() cancel the question in flight; record=False
+    # keeps warmup out of the /stats path and deadline counts.
+    return Warmup(lambda query, deadline: answer_query(query, llm, retriever, cache, deadline=deadline, record=False),
+                  questions).start(budget)
@@ -1,24 +1,182 @@
-from fastapi import FastAPI, Form, Request
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Form, HTTPException, Request
+from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from travelbot import hybrid_response, load_model_and_retriever
+from starlette.concurrency import run_in_threadpool
+from deadline import request_deadline
+from profiling import stage
+from safety import SENSITIVE_INPUT_WARNING, detect_pii_or_opsec
+from warmup import log_user_question, start_warmup
+
+MAX_BATCH_SIZE = 256
+DISCONNECT_POLL_INTERVAL = 0.25  # seconds between client-disconnect checks
+EXCERPT_CHARS = 400  # chunk text returned per excerpt by /api/ask
+COMPRESSION_MIN_SIZE = 500  # bytes; smaller responses are sent uncompressed
+# Static file names are not versioned, so browsers must revalidate every time;
+# the ETag turns an unchanged file into an empty 304.
+STATIC_CACHE_CONTROL = "no-cache"
+
+# When set, answers come from the shared model process (see model_server.py)
+# instead of models loaded inside this worker.
+MODEL_SOCKET = os.environ.get("TRAVELBOT_MODEL_SOCKET")
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles (which already sends ETag and answers If-None-Match with 304) plus Cache-Control."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", STATIC_CACHE_CONTROL)
+        return response
+
+# Cache warmup runs in the serving process once it starts, never at import:
+# in preload mode the import happens in the parent before the fork, and a
+# warmup thread there could hold a cache lock the children inherit. main.py
+# clears warmup_on_startup in all but one forked worker.
+warmup = None
+warmup_on_startup = True
+
+@asynccontextmanager
+async def lifespan(app):
+    global warmup
+    if warmup_on_startup and not MODEL_SOCKET:  # the model server warms its own caches
+        warmup = await run_in_threadpool(start_warmup, llm, retriever, cache)
+    yield
+    if warmup is not None:
+        warmup.stop()
 
 # Initialize FastAPI app
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app = FastAPI(lifespan=lifespan)
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
+app.mount("/public", CachedStaticFiles(directory="public", html=True), name="public")
+
+# Brotli when brotli-asgi is installed (it falls back to gzip for clients without br), else gzip
+try:
+    from brotli_asgi import BrotliMiddleware
+
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
 # Set up templates directory
 templates = Jinja2Templates(directory="templates")
 
-# Load the model and retriever once during app initialization
-llm, retriever = load_model_and_retriever()
+if MODEL_SOCKET:
+    from model_server import ModelClient
+
+    model_client = ModelClient(MODEL_SOCKET)
+
+    async def get_answer(query, deadline=None):
+        return await asyncio.wrap_future(model_client.submit(query, deadline=deadline))
+
+    async def get_result(query, deadline=None, excerpt_chars=None):
+        return await asyncio.wrap_future(
+            model_client.submit(query, op="answer", deadline=deadline, excerpt_chars=excerpt_chars))
+
+    async def get_answers(queries, deadline=None):
+        return await asyncio.wrap_future(model_client.submit(queries, op="answer_batch", deadline=deadline))
+
+    async def get_chunks(query, k):
+        return await asyncio.wrap_future(model_client.submit(query, op="chunks", k=k))
+else:
+    from answer_cache import get_default_cache
+    from retrieval import retrieve_chunks
+    from travelbot import (INDEX_NAME, VECTOR_DB_PATH, answer_batch, answer_query, hybrid_response,
+                           load_model_and_retriever, serialize_result)
+
+    # Load the model and retriever once during app initialization
+    llm, retriever = load_model_and_retriever()
+    cache = get_default_cache()
+
+    async def get_answer(query, deadline=None):
+        return await run_in_threadpool(hybrid_response, query, llm, retriever, cache, deadline=deadline)
+
+    async def get_result(query, deadline=None, excerpt_chars=None):
+        result = await run_in_threadpool(answer_query, query, llm, retriever, cache, deadline=deadline)
+        return serialize_result(query, result, excerpt_chars)
+
+    async def get_answers(queries, deadline=None):
+        results = await run_in_threadpool(answer_batch, queries, llm, retriever, cache, deadline=deadline)
+        return [serialize_result(query, result) for query, result in zip(queries, results)]
+
+    async def get_chunks(query, k):
+        return await run_in_threadpool(retrieve_chunks, query, k, retriever.vectorstore, VECTOR_DB_PATH, INDEX_NAME)
+
+class Question(BaseModel):
+    query: str
+    full_text: bool = False
+
+class BatchQuestion(BaseModel):
+    queries: List[str]
+
+async def answer_until_disconnect(request, answer_fn):
+    """Run answer_fn(deadline) within the request deadline, cancelling it if the client disconnects."""
+    deadline = request_deadline()
+    task = asyncio.ensure_future(answer_fn(deadline))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if not deadline.cancelled and await request.is_disconnected():
+            deadline.cancel()
 
 @app.get("/", response_class=HTMLResponse)
 async def form_page(request: Request):
     """Render the main form page."""
     return templates.TemplateResponse("form.html", {"request": request, "answer": None})
 
+@app.get("/stats")
+async def stats():
+    """Report pipeline paths taken, deadline outcomes and cache hit rates."""
+    if MODEL_SOCKET:
+        return await asyncio.wrap_future(model_client.submit("", op="stats"))
+    from travelbot import answer_path_counts, deadline_counts
+
+    return {
+        "paths": dict(answer_path_counts),
+        "deadlines": dict(deadline_counts),
+        "cache": cache.stats() if cache is not None else {},
+        "warmup": warmup.stats() if warmup is not None else {},
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Report preface/retrieval cache hit rates."""
+    return (await stats())["cache"]
+
+@app.get("/api/chunks")
+async def search_chunks(q: str, k: int = 3):
+    """Retrieval-only search: embed the query and return the top chunks, no generation."""
+    if detect_pii_or_opsec(q, check_names=False):
+        return {"query": q, "error": SENSITIVE_INPUT_WARNING, "chunks": []}
+    return {"query": q, "chunks": await get_chunks(q, max(1, min(k, 10)))}
+
+@app.post("/api/ask")
+async def ask(request: Request, body: Question):
+    """Answer one question as JSON: preface, chunk IDs, excerpts and sources as separate fields."""
+    query = body.query.strip()
+    if not query:
+        raise HTTPException(status_code=422, detail="Query must not be empty.")
+    if not detect_pii_or_opsec(query):
+        log_user_question(query, mode="api")  # feeds warmup's ranking after the next restart
+    excerpt_chars = None if body.full_text else EXCERPT_CHARS
+    return await answer_until_disconnect(request, lambda deadline: get_result(query, deadline, excerpt_chars))
+
+@app.post("/api/ask/batch")
+async def ask_batch(request: Request, body: BatchQuestion):
+    """Answer many questions at once; retrieval for the whole batch runs as one search."""
+    queries = [query.strip() for query in body.queries]
+    if not queries or len(queries) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"Send between 1 and {MAX_BATCH_SIZE} queries.")
+    if not all(queries):
+        raise HTTPException(status_code=422, detail="Queries must not be empty.")
+    return {"results": await answer_until_disconnect(request, lambda deadline: get_answers(queries, deadline))}
+
 @app.post("/", response_class=HTMLResponse)
 async def handle_query(request: Request, query: str = Form(...)):
     """Handle the user's query and return the response."""
@@ -26,8 +184,11 @@ async def handle_query(request: Request, query: str = Form(...)):
         if not query.strip():
             answer = "⚠️ Please enter a valid question."
         else:
-            answer = hybrid_response(query, llm, retriever)
+            if not detect_pii_or_opsec(query):
+                log_user_question(query, mode="web")
+            answer = await answer_until_disconnect(request, lambda deadline: get_answer(query, deadline))
     except Exception as e:
         answer = f"❌ An error occurred while processing your query: {e}"
 
-    return templates.TemplateResponse("form.html", {"request": request, "answer": answer, "query": query})
\ No newline at end of file
+    with stage("web.render"):
+        return templates.TemplateResponse("form.html", {"request": request, "answer": answer, "query": query})
@@ -0,0 +1,31 @@
+import time
+import hashlib
+
+from langchain_core.embeddings import Embeddings
+
+
+def hash_vector(text, dims=8):
+    """Deterministic embedding: the first dims bytes of the text's sha256, scaled to [0, 1]."""
+    return [b / 255.0 for b in hashlib.sha256(text.encode("utf-8")).digest()[:dims]]
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic 8-d embeddings for tests that need a vector store but no model.
+
+    delay slows each embed_documents batch (so a run can be killed mid-way);
+    calls counts every text embedded, across all instances.
+    """
+
+    calls = 0
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def embed_documents(self, texts):
+        time.sleep(self.delay)
+        HashEmbeddings.calls += len(texts)
+        return [hash_vector(t) for t in texts]
+
+    def embed_query(self, text):
+        HashEmbeddings.calls += 1
+        return hash_vector(text)
@@ -0,0 +1,28 @@
+import time
+
+TOKEN_TIME = 0.02  # seconds per generated token in the fake pipeline
+
+
+class SlowPipeline:
+    """Stands in for the flan-t5 pipeline: one token per TOKEN_TIME, honouring stopping_criteria.
+
+    calls records the max_new_tokens of every call.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt, max_new_tokens=100, stopping_criteria=None, **kwargs):
+        self.calls.append(max_new_tokens)
+        tokens = []
+        for _ in range(max_new_tokens):
+            time.sleep(TOKEN_TIME)
+            tokens.append("word")
+            if stopping_criteria and any(criterion(None, None) for criterion in stopping_criteria):
+                break
+        return [{"generated_text": " ".join(tokens)}]
+
+
+class SlowLLM:
+    def __init__(self):
+        self.pipeline = SlowPipeline()
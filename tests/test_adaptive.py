@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+import importlib.util
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from fake_llm import SlowLLM
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("transformers", "langchain_community", "faiss", "numpy"))
+
+
+@unittest.skipUnless(HAS_DEPS, "transformers/langchain/faiss not installed")
+class TestAdaptiveRouting(unittest.TestCase):
+    """The top retrieval similarity picks the path and the generation budget."""
+
+    @classmethod
+    def setUpClass(cls):
+        import travelbot
+
+        cls.travelbot = travelbot
+
+    def setUp(self):
+        self.travelbot.answer_path_counts.clear()
+
+    def answer(self, confidence, query="How many days of TLE can I claim?"):
+        from langchain_core.documents import Document
+
+        llm = SlowLLM()
+        scored = [("chunk-0", Document(page_content="TLE rules. " * 30, metadata={"source": "jtr_chunk0.txt"}),
+                   confidence)]
+        result = self.travelbot.answer_query(query, llm, None, adaptive=True, scored=scored)
+        return result, llm.pipeline.calls
+
+    def test_paths_at_and_around_the_thresholds(self):
+        high, low = self.travelbot.HIGH_CONFIDENCE, self.travelbot.LOW_CONFIDENCE
+        medium_tokens = self.travelbot.MEDIUM_CONFIDENCE_MAX_NEW_TOKENS
+        with mock.patch.object(self.travelbot, "HIGH_CONFIDENCE_MAX_NEW_TOKENS", 5):
+            for confidence, path, calls in [(1.0, "high", [5]), (high, "high", [5]),
+                                            (high - 0.01, "medium", [medium_tokens]),
+                                            (low, "medium", [medium_tokens]),
+                                            (low - 0.01, "low", []), (0.0, "low", [])]:
+                with self.subTest(confidence=confidence):
+                    result, pipeline_calls = self.answer(confidence)
+                    self.assertEqual(result["path"], path)
+                    self.assertEqual(pipeline_calls, calls)
+                    self.assertEqual(result["chunk_ids"], ["chunk-0"])
+        self.assertEqual(self.travelbot.answer_path_counts, {"high": 2, "medium": 2, "low": 2})
+
+    def test_confident_match_skips_generation_by_default(self):
+        with mock.patch.object(self.travelbot, "HIGH_CONFIDENCE_MAX_NEW_TOKENS", 0):
+            result, pipeline_calls = self.answer(1.0)
+        self.assertEqual((result["path"], result["preface"], pipeline_calls), ("high", "", []))
+
+    def test_low_confidence_never_calls_the_llm(self):
+        from langchain_core.documents import Document
+
+        llm = SlowLLM()
+        scored = [("chunk-0", Document(page_content="Unrelated text.", metadata={"source": "jtr_chunk0.txt"}), 0.1)]
+        answer = self.travelbot.hybrid_response("What is my TDY per diem?", llm, None, adaptive=True, scored=scored)
+        self.assertEqual(llm.pipeline.calls, [])
+        self.assertIn(self.travelbot.FALLBACK_MESSAGE, answer)
+
+
+if __name__ == '__main__':
+    unittest.main()
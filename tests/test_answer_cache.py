@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from answer_cache import AnswerCache, index_content_hash, normalize_query
+
+
+class TestAnswerCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def rows(self):
+        with sqlite3.connect(self.path) as db:
+            return db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def test_normalized_queries_share_a_key(self):
+        self.assertEqual(normalize_query("  How many DAYS\n\tof TLE? "), "how many days of tle?")
+        self.assertEqual(AnswerCache.make_key("preface", "How many DAYS of TLE?", model="flan-t5"),
+                         AnswerCache.make_key("preface", " how many days  of tle?", model="flan-t5"))
+        self.assertNotEqual(AnswerCache.make_key("preface", "How many days of TLE?", model="flan-t5"),
+                            AnswerCache.make_key("preface", "How many days of TLE?", model="flan-t5-base"))
+
+    def test_entries_expire_after_ttl(self):
+        cache = AnswerCache(self.path, ttl=60)
+        cache.set("preface", "key", "answer")
+        self.assertEqual(cache.get("preface", "key"), "answer")
+
+        later = time.time() + 61
+        with mock.patch("answer_cache.time.time", return_value=later):
+            self.assertIsNone(cache.get("preface", "key"))
+            # Expired on disk too, not just in the in-memory LRU.
+            self.assertIsNone(AnswerCache(self.path, ttl=60).get("preface", "key"))
+        self.assertEqual(cache.stats()["preface"]["misses"], 1)
+
+    def test_prune_keeps_most_recently_used_rows(self):
+        cache = AnswerCache(self.path, max_entries=10, memory_entries=0)
+        for i in range(99):
+            cache.set("retrieval", f"key-{i}", i)
+        self.assertEqual(self.rows(), 99)
+        cache.get("retrieval", "key-0")  # touched, so it survives the prune
+        cache.set("retrieval", "key-99", 99)  # the 100th write prunes
+
+        self.assertEqual(self.rows(), 10)
+        self.assertEqual(cache.get("retrieval", "key-0"), 0)
+        self.assertEqual(cache.get("retrieval", "key-99"), 99)
+        self.assertIsNone(cache.get("retrieval", "key-1"))
+
+    def test_rebuilt_index_changes_the_hash(self):
+        for ext, data in ((".faiss", b"vectors"), (".pkl", b"docstore")):
+            with open(os.path.join(self.tmp.name, f"travelbot{ext}"), "wb") as f:
+                f.write(data)
+        before = index_content_hash(self.tmp.name, "travelbot")
+        self.assertEqual(index_content_hash(self.tmp.name, "travelbot"), before)
+
+        with open(os.path.join(self.tmp.name, "travelbot.pkl"), "wb") as f:
+            f.write(b"rebuilt docstore")
+        after = index_content_hash(self.tmp.name, "travelbot")
+        self.assertNotEqual(after, before)
+
+        cache = AnswerCache(self.path)
+        cache.set("retrieval", AnswerCache.make_key("retrieval", "per diem", index=before), ["chunk-1"])
+        self.assertIsNone(cache.get("retrieval", AnswerCache.make_key("retrieval", "per diem", index=after)))
+
+    def test_connection_is_opened_lazily_and_per_process(self):
+        cache = AnswerCache(self.path, memory_entries=0)
+        self.assertFalse(os.path.exists(self.path))
+        cache.set("preface", "parent", "from parent")
+
+        pid = os.fork()
+        if pid == 0:  # child: must open its own connection and see the parent's rows
+            ok = cache.get("preface", "parent") == "from parent" and cache._pid == os.getpid()
+            cache.set("preface", "child", "from child")
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(cache.get("preface", "child"), "from child")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("langchain_community", "faiss", "numpy"))
+
+
+@unittest.skipUnless(HAS_DEPS, "langchain/faiss not installed")
+class TestBatchRetrieval(unittest.TestCase):
+    def test_batch_search_matches_one_search_per_query(self):
+        from langchain_community.vectorstores import FAISS
+        from retrieval import search_batch_with_ids, search_with_ids
+        from fake_embeddings import HashEmbeddings
+
+        texts = [f"JTR 0502{i:02d}: per diem, lodging and TLE rules." for i in range(20)]
+        db = FAISS.from_texts(texts, HashEmbeddings(), ids=[f"chunk-{i}" for i in range(20)])
+        queries = ["What is my TDY per diem?", "How many days of TLE can I claim?", "DLA on a PCS", texts[3]]
+
+        HashEmbeddings.calls = 0
+        batched = search_batch_with_ids(db, queries, k=4)
+        self.assertEqual(HashEmbeddings.calls, len(queries))  # one encoder pass for the batch
+
+        self.assertEqual(len(batched), len(queries))
+        for query, hits in zip(queries, batched):
+            single = search_with_ids(db, query, k=4)
+            self.assertEqual([doc_id for doc_id, _ in hits], [doc_id for doc_id, _ in single])
+            for (_, distance), (_, expected) in zip(hits, single):
+                self.assertAlmostEqual(distance, expected, places=5)
+        self.assertEqual(batched[3][0], ("chunk-3", 0.0))
+        self.assertEqual(search_batch_with_ids(db, [], k=4), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("langchain", "langchain_community", "faiss", "numpy"))
+
+
+@unittest.skipUnless(HAS_DEPS, "langchain/faiss not installed")
+class TestShardedBuild(unittest.TestCase):
+    def test_sharded_build_matches_serial_build(self):
+        from langchain_core.documents import Document
+        from build_index import embed_chunks
+        from fake_embeddings import HashEmbeddings
+
+        chunks = [Document(page_content=f"JTR 0502{i:02d}: per diem, TLE and DLA rules.",
+                           metadata={"source": f"jtr_chunk{i}.txt"}) for i in range(23)]
+        serial = embed_chunks(chunks, workers=1, embeddings=HashEmbeddings())
+        sharded = embed_chunks(chunks, workers=2, shard_size=5, embeddings=HashEmbeddings())
+
+        self.assertEqual(sharded.index.ntotal, len(chunks))
+        self.assertEqual(sharded.index_to_docstore_id, serial.index_to_docstore_id)
+        self.assertEqual(sharded.index.reconstruct_n(0, len(chunks)).tolist(),
+                         serial.index.reconstruct_n(0, len(chunks)).tolist())
+        for doc_id in serial.index_to_docstore_id.values():
+            self.assertEqual(sharded.docstore.search(doc_id), serial.docstore.search(doc_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
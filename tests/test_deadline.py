@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from deadline import Deadline, DeadlineStoppingCriteria
+from fake_llm import SlowLLM
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("transformers", "langchain_community", "faiss", "numpy"))
+
+
+class TestDeadline(unittest.TestCase):
+    def test_expiry_and_cancel(self):
+        deadline = Deadline(0.05)
+        self.assertFalse(deadline.expired())
+        time.sleep(0.06)
+        self.assertTrue(deadline.expired())
+
+        calls = []
+        deadline = Deadline()
+        deadline.on_cancel(lambda: calls.append(1))
+        self.assertIsNone(deadline.remaining())
+        deadline.cancel()
+        deadline.cancel()
+        self.assertTrue(deadline.expired())
+        self.assertEqual(calls, [1])
+
+    def test_stopping_criteria_flags_truncation(self):
+        criterion = DeadlineStoppingCriteria(Deadline(0))
+        self.assertTrue(criterion(None, None))
+        self.assertTrue(criterion.triggered)
+
+
+@unittest.skipUnless(HAS_DEPS, "transformers/langchain/faiss not installed")
+class TestDeadlineAwareAnswers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from langchain_community.vectorstores import FAISS
+        import travelbot
+        from fake_embeddings import HashEmbeddings
+
+        texts = [f"JTR 0502{i:02d}: per diem, lodging and TLE rules. " * 5 for i in range(6)]
+        db = FAISS.from_texts(texts, HashEmbeddings(), metadatas=[{"source": f"jtr_chunk{i}.txt"} for i in range(6)])
+        cls.travelbot = travelbot
+        cls.retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 2})
+
+    def setUp(self):
+        self.travelbot.deadline_counts.clear()
+
+    def test_generation_stops_at_deadline_with_excerpts(self):
+        from answer_cache import AnswerCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AnswerCache(path=os.path.join(tmp, "cache.sqlite"))
+            start_time = time.monotonic()
+            result = self.travelbot.answer_query(
+                "What is my TDY per diem?", SlowLLM(), self.retriever, cache, adaptive=False, deadline=Deadline(0.2))
+            elapsed = time.monotonic() - start_time
+
+            self.assertLess(elapsed, 1.0)  # uncapped generation takes 100 * TOKEN_TIME = 2s
+            self.assertTrue(result["truncated"])
+            self.assertTrue(result["preface"])
+            self.assertEqual(len(result["documents"]), 2)
+            self.assertEqual(self.travelbot.deadline_counts["truncated"], 1)
+            # A partial preface must never be served from the cache later.
+            self.assertEqual(cache.stats()["preface"]["misses"], 1)
+            self.assertIsNone(cache.get("preface", cache.make_key(
+                "preface", "What is my TDY per diem?",
+                model_id=self.travelbot.MODEL_ID, params=self.travelbot.GENERATION_PARAMS)))
+
+    def test_cancel_stops_work_for_disconnected_client(self):
+        deadline = Deadline(30)
+        threading.Timer(0.1, deadline.cancel).start()
+        start_time = time.monotonic()
+        answer = self.travelbot.hybrid_response(
+            "What is my TDY per diem?", SlowLLM(), self.retriever, adaptive=False, deadline=deadline)
+
+        self.assertLess(time.monotonic() - start_time, 1.0)
+        self.assertEqual(answer, self.travelbot.REQUEST_CANCELLED_MESSAGE)
+        self.assertEqual(self.travelbot.deadline_counts["cancelled"], 1)
+
+        # Work still queued when the client goes away is skipped entirely.
+        result = self.travelbot.answer_query("What is TLE?", SlowLLM(), self.retriever, deadline=deadline)
+        self.assertEqual(result["path"], "cancelled")
+        self.assertEqual(self.travelbot.deadline_counts["cancelled"], 2)
+
+    def test_overload_is_bounded_by_deadline(self):
+        requests, workers, budget = 12, 2, 0.4
+        llm = SlowLLM()
+
+        def handle(query):
+            deadline = Deadline(budget)  # starts when the request arrives, not when a worker is free
+            return pool.submit(self.travelbot.answer_query, query, llm, self.retriever, None, False, None, deadline)
+
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [handle(f"Question {i} about per diem?") for i in range(requests)]
+            results = [future.result() for future in futures]
+        elapsed = time.monotonic() - start_time
+
+        # Without deadlines this is requests / workers * 2s = 12s of generation.
+        self.assertLess(elapsed, 3.0)
+        self.assertTrue(all(result["truncated"] for result in results))
+        self.assertTrue(all(len(result["documents"]) == 2 for result in results))
+        self.assertEqual(self.travelbot.deadline_counts["truncated"], requests)
+
+    def test_unrecorded_answers_leave_the_counters_alone(self):
+        self.travelbot.answer_path_counts.clear()
+        deadline = Deadline(0.2)
+        self.travelbot.answer_query("What is my TDY per diem?", SlowLLM(), self.retriever, adaptive=False,
+                                    deadline=deadline, record=False)
+        deadline.cancel()
+        self.travelbot.answer_query("What is TLE?", SlowLLM(), self.retriever, deadline=deadline, record=False)
+        self.assertEqual(self.travelbot.answer_path_counts, {})
+        self.assertEqual(self.travelbot.deadline_counts, {})
+
+    def test_batch_shares_one_deadline(self):
+        queries = [f"Question {i} about per diem?" for i in range(5)]
+        start_time = time.monotonic()
+        results = self.travelbot.answer_batch(
+            queries, SlowLLM(), self.retriever, adaptive=False, deadline=Deadline(0.3))
+
+        self.assertLess(time.monotonic() - start_time, 1.5)  # uncapped: 5 * 2s
+        self.assertTrue(all(result["truncated"] for result in results))
+        self.assertTrue(all(len(result["documents"]) == 2 for result in results))
+
+        deadline = Deadline(30)
+        deadline.cancel()
+        results = self.travelbot.answer_batch(queries, SlowLLM(), self.retriever, adaptive=False, deadline=deadline)
+        self.assertEqual([result["path"] for result in results], ["cancelled"] * len(queries))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import unittest
+import subprocess
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SRC)
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("langchain", "langchain_core", "faiss", "numpy"))
+TOTAL_CHUNKS = 60
+BATCH_SIZE = 4
+
+CHILD = """
+import sys
+sys.path[:0] = [{src!r}, {tests!r}]
+from fake_embeddings import HashEmbeddings
+from test_ingest_resume import make_chunks
+import ingest
+ingest.ingest(make_chunks(), HashEmbeddings(delay=0.2), {out!r}, "travelbot", "fixture",
+              batch_size={batch_size}, checkpoint_every=1)
+"""
+
+if HAS_DEPS:
+    from langchain_core.documents import Document
+    from fake_embeddings import HashEmbeddings
+
+    def make_chunks():
+        for i in range(TOTAL_CHUNKS):
+            yield Document(page_content=f"Regulation chunk {i}: per diem, TLE and DLA text.", metadata={"n": i})
+
+
+@unittest.skipUnless(HAS_DEPS, "langchain/faiss not installed")
+class TestIngestResume(unittest.TestCase):
+    def test_killed_run_resumes_from_last_checkpoint(self):
+        import ingest
+        from langchain_community.vectorstores import FAISS
+
+        with tempfile.TemporaryDirectory() as out:
+            checkpoint = os.path.join(out, "travelbot.ingest", ingest.CHECKPOINT_FILE)
+            child = subprocess.Popen([sys.executable, "-c", CHILD.format(
+                src=SRC, tests=TESTS, out=out, batch_size=BATCH_SIZE)])
+            try:
+                deadline = time.time() + 60
+                committed = 0
+                while committed < 3 * BATCH_SIZE and time.time() < deadline:
+                    self.assertIsNone(child.poll(), "ingestion finished before it could be killed")
+                    if os.path.exists(checkpoint):
+                        with open(checkpoint, "r", encoding="utf-8") as f:
+                            committed = json.load(f)["committed_chunks"]
+                    time.sleep(0.05)
+            finally:
+                child.send_signal(signal.SIGKILL)
+                child.wait()
+
+            self.assertGreaterEqual(committed, 3 * BATCH_SIZE)
+            self.assertLess(committed, TOTAL_CHUNKS)
+            self.assertFalse(os.path.exists(os.path.join(out, "travelbot.faiss")))
+
+            total = ingest.ingest(make_chunks(), HashEmbeddings(), out, "travelbot", "fixture",
+                                  batch_size=BATCH_SIZE, checkpoint_every=1)
+            self.assertEqual(total, TOTAL_CHUNKS)
+            self.assertFalse(os.path.exists(os.path.join(out, "travelbot.ingest")))
+
+            db = FAISS.load_local(out, HashEmbeddings(), index_name="travelbot",
+                                  allow_dangerous_deserialization=True)
+            self.assertEqual(db.index.ntotal, TOTAL_CHUNKS)
+            self.assertEqual(sorted(db.index_to_docstore_id.values()),
+                             sorted(f"chunk-{i}" for i in range(TOTAL_CHUNKS)))
+            for i, chunk in enumerate(make_chunks()):
+                self.assertEqual(db.docstore.search(f"chunk-{i}").page_content, chunk.page_content)
+
+    def test_checkpoint_for_other_corpus_is_discarded(self):
+        import ingest
+
+        with tempfile.TemporaryDirectory() as out:
+            work_dir = os.path.join(out, "travelbot.ingest")
+            os.makedirs(work_dir)
+            with open(os.path.join(work_dir, ingest.CHECKPOINT_FILE), "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": "other", "committed_chunks": 8, "snapshot": "snapshot-000000008"}, f)
+
+            total = ingest.ingest(make_chunks(), HashEmbeddings(), out, "travelbot", "fixture",
+                                  batch_size=BATCH_SIZE, checkpoint_every=5)
+            self.assertEqual(total, TOTAL_CHUNKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+        def load_counted(model_id, dtype):
+            time.sleep(0.05)  # long enough for concurrent acquires to overlap
+            self.loads.append((model_id, dtype))
+            return object()
+
+        model_registry.LOADERS["counted"] = load_counted
+        self.addCleanup(model_registry.LOADERS.pop, "counted")
+
+    def test_concurrent_acquires_share_one_load(self):
+        registry = ModelRegistry()
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(registry.acquire("m", "counted")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loads, [("m", None)])
+        self.assertTrue(all(model is models[0] for model in models))
+        self.assertEqual(registry.loaded(), {("m", "counted", None): 8})
+
+        # A different dtype is a different model.
+        registry.acquire("m", "counted", "float16")
+        self.assertEqual(len(self.loads), 2)
+
+    def test_idle_model_is_unloaded_after_timeout(self):
+        registry = ModelRegistry(idle_timeout=0.1)
+        first = registry.acquire("m", "counted")
+        registry.acquire("m", "counted")
+        registry.release("m", "counted")
+        time.sleep(0.2)
+        self.assertIn(("m", "counted", None), registry.loaded())  # still held once
+
+        registry.release("m", "counted")
+        time.sleep(0.2)
+        self.assertEqual(registry.loaded(), {})
+        self.assertIsNot(registry.acquire("m", "counted"), first)
+        self.assertEqual(len(self.loads), 2)
+
+    def test_serving_holders_pin_models_builders_release(self):
+        registry = ModelRegistry(idle_timeout=0.1)
+        served = registry.acquire("shared", "counted")  # a serving path: never released
+
+        # An index builder borrows the same model, and another one only it uses.
+        self.assertIs(registry.acquire("shared", "counted"), served)
+        registry.acquire("builder-only", "counted")
+        registry.release("shared", "counted")
+        registry.release("builder-only", "counted")
+        time.sleep(0.2)
+
+        self.assertEqual(registry.loaded(), {("shared", "counted", None): 1})
+        self.assertIs(registry.acquire("shared", "counted"), served)
+        self.assertEqual(self.loads, [("shared", None), ("builder-only", None)])
+
+    def test_clear_forgets_every_model(self):
+        registry = ModelRegistry()
+        first = registry.acquire("m", "counted")
+        registry.clear()
+        self.assertEqual(registry.loaded(), {})
+        self.assertIsNot(registry.acquire("m", "counted"), first)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ModelRegistry().acquire("m", "onnx-magic")
+
+
+if __name__ == '__main__':
+    unittest.main()
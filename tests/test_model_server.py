@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import socket
+import tempfile
+import threading
+import unittest
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from deadline import Deadline
+from fake_llm import SlowLLM
+from model_server import ModelClient, ModelServer
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("transformers", "langchain_community", "faiss", "numpy"))
+
+
+@unittest.skipUnless(HAS_DEPS, "transformers/langchain/faiss not installed")
+class TestModelServerProtocol(unittest.TestCase):
+    """A real ModelServer on a temp socket, with a fake flan-t5 and an 8-d FAISS index."""
+
+    @classmethod
+    def setUpClass(cls):
+        from langchain_community.vectorstores import FAISS
+        import travelbot
+        from fake_embeddings import HashEmbeddings
+
+        texts = [f"JTR 0502{i:02d}: per diem, lodging and TLE rules. " * 5 for i in range(6)]
+        db = FAISS.from_texts(texts, HashEmbeddings(), metadatas=[{"source": f"jtr_chunk{i}.txt"} for i in range(6)])
+        cls.travelbot = travelbot
+        cls.retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 2})
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.socket_path = os.path.join(tmp.name, "model.sock")
+        self.client = ModelClient(self.socket_path, timeout=10)
+
+    def start_server(self):
+        server = ModelServer(self.socket_path, SlowLLM(), self.retriever, max_concurrency=4)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+        self.addCleanup(stop)
+        return server
+
+    def test_ping(self):
+        self.start_server()
+        self.assertTrue(self.client.ping())
+
+    def test_replies_arrive_out_of_order(self):
+        self.start_server()
+        slow = self.client.submit("What is my TDY per diem?", deadline=Deadline(1.0))
+        self.assertEqual(self.client.submit("", op="ping").result(timeout=5), "pong")
+        self.assertFalse(slow.done())  # the ping overtook it on the same connection
+        self.assertIn("Sources:", slow.result(timeout=5))
+
+    def test_cancel_frame_stops_generation(self):
+        self.start_server()
+        deadline = Deadline(30)
+        start_time = time.monotonic()
+        future = self.client.submit("What is my TDY per diem?", deadline=deadline)
+        time.sleep(0.1)
+        deadline.cancel()
+
+        self.assertEqual(future.result(timeout=5), self.travelbot.REQUEST_CANCELLED_MESSAGE)
+        self.assertLess(time.monotonic() - start_time, 1.0)  # uncancelled generation takes 2s
+
+    def test_concurrent_answers_are_truncated_at_their_deadlines(self):
+        self.start_server()
+        start_time = time.monotonic()
+        futures = [self.client.submit(f"Question {i} about per diem?", op="answer", deadline=Deadline(0.3))
+                   for i in range(4)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertLess(time.monotonic() - start_time, 1.5)  # uncapped: 4 concurrent * 2s
+        self.assertEqual([result["query"] for result in results], [f"Question {i} about per diem?" for i in range(4)])
+        self.assertTrue(all(result["truncated"] for result in results))
+        self.assertTrue(all(len(result["chunks"]) == 2 for result in results))
+
+    def test_answer_batch_and_chunks(self):
+        self.start_server()
+        queries = [f"Question {i} about per diem?" for i in range(3)]
+        results = self.client.submit(queries, op="answer_batch", deadline=Deadline(0.3)).result(timeout=5)
+        self.assertEqual([result["query"] for result in results], queries)
+        self.assertTrue(all(len(result["chunks"]) == 2 for result in results))
+
+        chunks = self.client.submit("How is TLE paid?", op="chunks", k=3).result(timeout=5)
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(all(chunk["source"].startswith("jtr_chunk") for chunk in chunks))
+
+    def test_errors_fail_only_their_request(self):
+        self.start_server()
+        future = self.client.submit(None, op="answer")
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        self.assertTrue(self.client.ping())
+
+    def test_dropped_server_fails_pending_requests_and_client_reconnects(self):
+        # A server that accepts one request and dies before answering it.
+        dying = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        dying.bind(self.socket_path)
+        dying.listen(1)
+
+        def accept_and_drop():
+            conn, _ = dying.accept()
+            conn.makefile("r").readline()
+            conn.close()
+            dying.close()
+            os.remove(self.socket_path)
+        dropper = threading.Thread(target=accept_and_drop)
+        dropper.start()
+
+        pending = self.client.submit("What is my TDY per diem?")
+        with self.assertRaises(ConnectionError):
+            pending.result(timeout=5)
+        dropper.join()
+
+        # The next request opens a fresh connection to the restarted server.
+        self.start_server()
+        self.assertTrue(self.client.ping())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+import unittest
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from paragraph_index import extract_identifiers, query_identifiers
+
+HAS_DEPS = all(importlib.util.find_spec(m) for m in ("langchain_community", "faiss", "numpy"))
+
+CHUNKS = [
+    ("JTR_chunk809.txt", "020309.  Trip Length As It Affects Per Diem \n \nTable 2-20.  Per Diem Reimbursement \n"),
+    ("JTR_chunk133.txt", "054714. \n054715. \nIntro   Chapter 1   Chapter 2   Chapter 3\n"),  # table of contents
+    ("dafi36-3003_chunk99.txt", "2.4.4.  Non-Accrual.  Members do not accrue leave in the following circumstances:"),
+    ("dafi36-3003_chunk571.txt", "5.4.8.  Do not grant a special pass.\nChapter 6 \nSPECIAL LEAVE ACCRUAL"),
+    ("JTR_chunk2251.txt", "PCS per diem is paid for authorized travel days when traveling by airplane or ship."),
+]
+
+
+class TestParagraphIdentifiers(unittest.TestCase):
+    def test_headings_are_extracted_per_publication(self):
+        self.assertEqual(extract_identifiers(CHUNKS[0][1], CHUNKS[0][0]), [
+            "JTR|para|020309", "*|para|020309", "JTR|table|2-20", "*|table|2-20"])
+        self.assertEqual(extract_identifiers(CHUNKS[1][1], CHUNKS[1][0]), [])
+        self.assertIn("DAFI 36-3003|para|2.4.4", extract_identifiers(CHUNKS[2][1], CHUNKS[2][0]))
+        self.assertIn("DAFI 36-3003|chapter|6", extract_identifiers(CHUNKS[3][1], CHUNKS[3][0]))
+
+    def test_citations_in_questions(self):
+        self.assertEqual(query_identifiers("What does JTR 050201 say?"), ["JTR|para|050201"])
+        self.assertEqual(query_identifiers("Show me Table 5-2"), ["*|table|5-2"])
+        self.assertEqual(query_identifiers("DAFI 36-3003 para 4.3"), ["DAFI 36-3003|para|4.3"])
+        self.assertEqual(query_identifiers("AFMAN 65-114 chapter 7"), ["AFMAN 65-114|chapter|7"])
+        self.assertEqual(query_identifiers("What is my TDY per diem for 3 days?"), [])
+
+
+@unittest.skipUnless(HAS_DEPS, "langchain/faiss not installed")
+class TestParagraphLookup(unittest.TestCase):
+    def test_cited_paragraph_skips_embedding(self):
+        from langchain_community.vectorstores import FAISS
+        from paragraph_index import save_lookup
+        from retrieval import retrieve_chunks
+        from fake_embeddings import HashEmbeddings
+
+        db = FAISS.from_texts([text for _, text in CHUNKS], HashEmbeddings(),
+                              metadatas=[{"source": source} for source, _ in CHUNKS],
+                              ids=[f"chunk-{i}" for i in range(len(CHUNKS))])
+        with tempfile.TemporaryDirectory() as tmp:
+            db.save_local(tmp, index_name="travelbot")
+            save_lookup(db, tmp, "travelbot")
+
+            HashEmbeddings.calls = 0
+            chunks = retrieve_chunks("What does DAFI 36-3003 para 2.4.4 say?", 3, db, tmp, "travelbot")
+            self.assertEqual([chunk["id"] for chunk in chunks], ["chunk-2"])
+            self.assertEqual(chunks[0]["score"], 1.0)
+            self.assertEqual(HashEmbeddings.calls, 0)
+
+            # Uncited (or unknown) identifiers fall back to vector search.
+            retrieve_chunks("How is PCS per diem paid?", 3, db, tmp, "travelbot")
+            retrieve_chunks("Table 9-99 rates", 3, db, tmp, "travelbot")
+            self.assertEqual(HashEmbeddings.calls, 2)
+
+            # A lookup built for another version of the index is ignored.
+            db.add_texts(["050101.  New paragraph"], ids=["chunk-new"])
+            db.save_local(tmp, index_name="travelbot")
+            retrieve_chunks("JTR 020309", 3, db, tmp, "travelbot")
+            self.assertEqual(HashEmbeddings.calls, 3)
+
+    def test_cited_paragraph_outranks_its_chapter(self):
+        from langchain_community.vectorstores import FAISS
+        from paragraph_index import lookup, save_lookup
+        from fake_embeddings import HashEmbeddings
+
+        chapter_pages = [("JTR_chunk700.txt", "Chapter 2 \nUniformed Member Travel"),
+                         ("JTR_chunk750.txt", "Chapter 2 \nPOV mileage is paid per mile."),
+                         ("JTR_chunk780.txt", "Chapter 2 \nA round trip is reimbursed by distance.")]
+        chunks = chapter_pages + CHUNKS
+        db = FAISS.from_texts([text for _, text in chunks], HashEmbeddings(),
+                              metadatas=[{"source": source} for source, _ in chunks],
+                              ids=[f"chunk-{i}" for i in range(len(chunks))])
+        with tempfile.TemporaryDirectory() as tmp:
+            db.save_local(tmp, index_name="travelbot")
+            identifiers = save_lookup(db, tmp, "travelbot")
+
+            self.assertEqual(identifiers["JTR|chapter|2"], ["chunk-0"])  # where the chapter starts
+            self.assertEqual(lookup("POV mileage under JTR chapter 2, see 020309?", tmp, "travelbot", 1),
+                             ["chunk-3"])
+            self.assertEqual(lookup("POV mileage under JTR chapter 2, see 020309?", tmp, "travelbot"),
+                             ["chunk-3", "chunk-0"])
+
+    def test_batch_lookup_hits_bypass_the_cache(self):
+        from unittest import mock
+        from langchain_community.vectorstores import FAISS
+        from answer_cache import AnswerCache
+        from paragraph_index import save_lookup
+        from fake_embeddings import HashEmbeddings
+        import travelbot
+
+        db = FAISS.from_texts([text for _, text in CHUNKS], HashEmbeddings(),
+                              metadatas=[{"source": source} for source, _ in CHUNKS],
+                              ids=[f"chunk-{i}" for i in range(len(CHUNKS))])
+        with tempfile.TemporaryDirectory() as tmp:
+            db.save_local(tmp, index_name="travelbot")
+            save_lookup(db, tmp, "travelbot")
+            cache = AnswerCache(os.path.join(tmp, "cache.sqlite"))
+            with mock.patch.object(travelbot, "VECTOR_DB_PATH", tmp), \
+                    mock.patch.object(travelbot, "INDEX_NAME", "travelbot"):
+                results = travelbot.retrieve_scored_batch(
+                    ["What does DAFI 36-3003 para 2.4.4 say?", "How is PCS per diem paid?"],
+                    db.as_retriever(search_kwargs={"k": 3}), cache)
+
+        self.assertEqual([doc_id for doc_id, _, _ in results[0]], ["chunk-2"])
+        self.assertEqual(len(results[1]), 3)
+        self.assertEqual(cache.stats()["retrieval"]["misses"], 1)  # only the uncited question
+
+
+if __name__ == '__main__':
+    unittest.main()
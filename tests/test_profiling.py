@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from profiling import Profiler
+from bench_memory import regressions
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler()
+        with profiler.stage("answer.format"):
+            pass
+        self.assertEqual(profiler.report()["stages"], {})
+        self.assertIsNone(profiler.write_report())
+
+    def test_nested_stages_report_peaks_and_allocators(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler(report_path=os.path.join(tmp, "report.json"))
+            profiler.enable()
+            self.addCleanup(profiler.disable)
+
+            with profiler.stage("startup"):
+                with profiler.stage("startup.docstore"):
+                    kept = [str(i) * 20 for i in range(30000)]  # ~3 MB of Python objects
+                with profiler.stage("answer.format"):
+                    "\n\n".join(kept)
+            with open(profiler.write_report(), "r", encoding="utf-8") as f:
+                report = json.load(f)
+
+        stages = report["stages"]
+        self.assertEqual(set(stages), {"startup", "startup.docstore", "answer.format"})
+        docstore = stages["startup.docstore"]
+        self.assertGreater(docstore["traced_peak_mb"], 2)
+        self.assertIn(f"{__file__}:", docstore["top_allocations"][0]["line"])
+        self.assertGreater(stages["answer.format"]["traced_peak_mb"], 0.5)  # the joined string
+        # A parent's peak covers its children's.
+        self.assertGreaterEqual(stages["startup"]["peak_rss_mb"], docstore["peak_rss_mb"])
+        self.assertGreaterEqual(stages["startup"]["traced_peak_mb"], docstore["traced_peak_mb"])
+        self.assertGreaterEqual(report["peak_rss_mb"], stages["startup"]["peak_rss_mb"])
+
+    def test_regression_threshold(self):
+        baseline = {"total": 1000.0, "startup.weights": 900.0, "answer.format": 2.0}
+        current = {"total": 1080.0, "startup.weights": 1000.0, "answer.format": 6.0, "new.stage": 50.0}
+        self.assertEqual(regressions(current, baseline, 0.10), [("startup.weights", 900.0, 1000.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+# Time budgets for the retrieval-only path (seconds); override on slow CI hosts.
+IMPORT_BUDGET = float(os.environ.get("TRAVELBOT_IMPORT_BUDGET", "1.0"))
+STARTUP_BUDGET = float(os.environ.get("TRAVELBOT_STARTUP_BUDGET", "20.0"))
+INDEX_DIR = os.path.join(ROOT, "vectordb_retrain")
+INDEX_NAME = "travelbot_retrain"
+
+HEAVY_MODULES = ["torch", "transformers", "langchain_community.llms"]
+
+
+def run_probe(code):
+    """Run code in a fresh interpreter (cold imports) and return its JSON output."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": SRC},
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestRetrievalStartup(unittest.TestCase):
+    def test_import_is_generation_free_and_fast(self):
+        report = run_probe(
+            "import sys, time, json\n"
+            "start = time.perf_counter()\n"
+            "import retrieval, chunkbot\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+        )
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["elapsed"], IMPORT_BUDGET)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("faiss") and importlib.util.find_spec("langchain_community")
+        and importlib.util.find_spec("fastembed") and os.path.exists(os.path.join(INDEX_DIR, f"{INDEX_NAME}.faiss")),
+        "retrieval dependencies or index not available",
+    )
+    def test_startup_and_first_query_within_budget(self):
+        report = run_probe(
+            "import sys, time, json\n"
+            "start = time.perf_counter()\n"
+            "from retrieval import load_vectorstore, retrieve_chunks\n"
+            f"store = load_vectorstore({INDEX_DIR!r}, {INDEX_NAME!r}, encoder='fastembed')\n"
+            "chunks = retrieve_chunks('What is my TDY per diem?', k=3, vectorstore=store)\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps({{'elapsed': elapsed, 'chunks': len(chunks), 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+        )
+        self.assertEqual(report["loaded"], [])
+        self.assertGreater(report["chunks"], 0)
+        self.assertLess(report["elapsed"], STARTUP_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
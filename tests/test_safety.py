@@ -0,0 +1,28 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from safety import detect_pii_or_opsec
+
+
+class TestSensitiveInput(unittest.TestCase):
+    def test_patterns_are_flagged_in_every_mode(self):
+        for question in ["My SSN is 123-45-6789", "Call me at (555) 123-4567", "Is the grid ref secret?"]:
+            self.assertTrue(detect_pii_or_opsec(question))
+            self.assertTrue(detect_pii_or_opsec(question, check_names=False))
+
+    def test_names_are_only_flagged_when_asked(self):
+        question = "What does Joint Travel Regulations say about per diem"
+        self.assertTrue(detect_pii_or_opsec(question))  # generated answers: may be a name
+        self.assertFalse(detect_pii_or_opsec(question, check_names=False))  # chunk search
+
+    def test_safe_context_words_win(self):
+        self.assertFalse(detect_pii_or_opsec("Can John Smith claim TDY per diem?"))
+        self.assertFalse(detect_pii_or_opsec("What is my per diem rate?"))
+
+
+if __name__ == '__main__':
+    unittest.main()
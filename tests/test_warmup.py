@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from warmup import Warmup, log_user_question, parse_question_log, rank_questions
+
+
+class TestWarmup(unittest.TestCase):
+    def test_ranking_weighs_frequency_and_recency(self):
+        now = datetime(2025, 6, 1, 12, 0, 0)
+        old = (now - timedelta(days=60)).strftime("%Y-%m-%d %H:%M:%S")
+        recent = (now - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+        lines = [
+            "Q: How much parental leave do I get after adopting?",
+            "A: Up to 12 weeks. [dafi_parental_leave.txt]",
+            "",
+            *[f"Q: What is my TDY per diem? (Asked on {old}, Mode: context)"] * 3,
+            f"Q: How many days of TLE can I claim? (Asked on {recent}, Mode: chunk)",
+            f"Q: how many days of TLE can I claim?  (Asked on {recent}, Mode: context)",
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample_questions.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            entries = parse_question_log(path)
+
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(entries[0], ("How much parental leave do I get after adopting?", None, None))
+        self.assertEqual(entries[-1][2], "context")
+        # Two recent asks beat three asks from two months ago; the undated sample ranks above those too.
+        self.assertEqual(rank_questions(entries, limit=2, now=now), [
+            "how many days of TLE can I claim?",
+            "How much parental leave do I get after adopting?",
+        ])
+
+    def test_startup_waits_at_most_the_budget(self):
+        answered = []
+
+        def slow_answer(query, deadline):
+            end = time.monotonic() + 0.2
+            while time.monotonic() < end and not deadline.expired():
+                time.sleep(0.01)
+            answered.append((query, deadline.cancelled))
+
+        start_time = time.monotonic()
+        warmup = Warmup(slow_answer, ["q1", "q2", "q3"]).start(budget=0.05)
+        self.assertLess(time.monotonic() - start_time, 0.15)
+        self.assertFalse(warmup.done())
+
+        warmup.stop()
+        self.assertTrue(warmup.done())
+        self.assertEqual(answered, [("q1", True)])  # the in-flight question was cancelled, the rest skipped
+
+    def test_exit_commands_and_sensitive_questions_are_not_replayed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample_questions.txt")
+            for question in ["How many days of TLE can I claim?", "exit", " Quit", "My SSN is 123-45-6789"]:
+                log_user_question(question, mode="api", path=path)
+            entries = parse_question_log(path)
+
+        self.assertEqual([(question, mode) for question, _, mode in entries],
+                         [("How many days of TLE can I claim?", "api")])
+        self.assertIsNotNone(entries[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
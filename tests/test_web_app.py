@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import importlib
+import importlib.util
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from fake_llm import SlowLLM
+
+HAS_DEPS = all(importlib.util.find_spec(m)
+               for m in ("fastapi", "httpx", "jinja2", "transformers", "langchain_community", "faiss", "numpy"))
+
+
+@unittest.skipUnless(HAS_DEPS, "fastapi/transformers/langchain/faiss not installed")
+class TestWebApp(unittest.TestCase):
+    """web_app in IPC mode, answering through a real ModelServer on a temp socket."""
+
+    @classmethod
+    def setUpClass(cls):
+        from fastapi.testclient import TestClient
+        from langchain_community.vectorstores import FAISS
+        from model_server import ModelServer
+        from fake_embeddings import HashEmbeddings
+
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        socket_path = os.path.join(tmp.name, "model.sock")
+
+        texts = [f"JTR 0502{i:02d}: per diem, lodging and TLE rules. " * 10 for i in range(6)]
+        db = FAISS.from_texts(texts, HashEmbeddings(), metadatas=[{"source": f"jtr_chunk{i}.txt"} for i in range(6)])
+        server = ModelServer(socket_path, SlowLLM(), db.as_retriever(search_kwargs={"k": 2}))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(server.server_close)
+        cls.addClassCleanup(server.shutdown)
+
+        # web_app mounts static/, public/ and templates/ relative to the working directory.
+        cwd = os.getcwd()
+        os.chdir(ROOT)
+        cls.addClassCleanup(os.chdir, cwd)
+        with mock.patch.dict(os.environ, {"TRAVELBOT_MODEL_SOCKET": socket_path}):
+            sys.modules.pop("web_app", None)
+            cls.web_app = importlib.import_module("web_app")
+        cls.addClassCleanup(sys.modules.pop, "web_app", None)
+        cls.client = TestClient(cls.web_app.app)
+
+    def test_ask_returns_separate_json_fields(self):
+        with mock.patch.object(self.web_app, "log_user_question") as log:
+            response = self.client.post("/api/ask", json={"query": "How many days of TLE can I claim?"},
+                                        headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        body = response.json()  # decompressed by the client
+        self.assertEqual(set(body), {"query", "path", "preface", "truncated", "chunks", "sources"})
+        self.assertEqual(body["path"], "full")
+        self.assertTrue(body["preface"])
+        self.assertEqual(len(body["chunks"]), 2)
+        self.assertEqual(set(body["chunks"][0]), {"id", "source", "score", "excerpt"})
+        self.assertLessEqual(len(body["chunks"][0]["excerpt"]), self.web_app.EXCERPT_CHARS)
+        self.assertEqual(body["sources"], sorted({chunk["source"].split("_chunk")[0] for chunk in body["chunks"]}))
+        log.assert_called_once_with("How many days of TLE can I claim?", mode="api")
+
+    def test_sensitive_and_empty_questions(self):
+        with mock.patch.object(self.web_app, "log_user_question") as log:
+            response = self.client.post("/api/ask", json={"query": "My SSN is 123-45-6789"})
+            self.assertEqual(response.json()["path"], "blocked")
+            self.assertEqual(self.client.post("/api/ask", json={"query": "  "}).status_code, 422)
+        log.assert_not_called()
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get("/stats", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_static_files_are_revalidated_by_etag(self):
+        for path in ("/static/styles.css", "/public/"):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["Cache-Control"], "no-cache")
+            self.assertIn("ETag", response.headers)
+
+            revalidated = self.client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.content, b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
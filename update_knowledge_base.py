@@ -1,16 +1,21 @@
 import os
+import sys
 import logging
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 import fitz  # PyMuPDF
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from model_registry import registry
+from paragraph_index import save_lookup
+
 # --- Configuration ---
 SOURCE_DIR = "rag/source_docs"
 CHUNK_DIR = "rag/jtr_chunks"
 INDEX_DIR = "vectordb"
 INDEX_NAME = "travelbot"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 CHUNK_SIZE = 300
 CHUNK_OVERLAP = 30
 BAD_PHRASES = ["always entitled", "use LeaveWeb", "POV always reimbursed"]
@@ -74,9 +79,13 @@ def rebuild_vector_index():
                 with open(os.path.join(CHUNK_DIR, fname), "r", encoding="utf-8") as f:
                     documents.append(Document(page_content=f.read(), metadata={"source": fname}))
 
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        db = FAISS.from_documents(documents, embeddings)
+        embeddings = registry.acquire(EMBEDDING_MODEL, "sentence-transformers")
+        try:
+            db = FAISS.from_documents(documents, embeddings)
+        finally:
+            registry.release(EMBEDDING_MODEL, "sentence-transformers")
         db.save_local(INDEX_DIR, index_name=INDEX_NAME)
+        save_lookup(db, INDEX_DIR, INDEX_NAME)
         logger.info("✅ Vector DB updated and saved.")
     except Exception as e:
         logger.error(f"❌ Failed to rebuild vector database: {e}")